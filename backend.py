@@ -1,30 +1,55 @@
-from flask import Flask, request, jsonify, send_from_directory, render_template, session
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Serve on eventlet's green-thread loop by default: one OS thread per socket
+# doesn't hold up under load. Development keeps threading for the reloader/debugger.
+# eventlet has to patch the stdlib before Flask, requests etc. are imported
+SOCKETIO_ASYNC_MODE = os.environ.get('SOCKETIO_ASYNC_MODE') or (
+    'threading' if os.environ.get('FLASK_ENV') == 'development' else 'eventlet')
+if SOCKETIO_ASYNC_MODE == 'eventlet':
+    import eventlet
+    eventlet.monkey_patch()
+
+from flask import (Flask, Response, request, jsonify, send_from_directory, render_template, session,
+                   stream_with_context, g, has_app_context)
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
 from flask_socketio import SocketIO, emit, join_room, leave_room
 from werkzeug.security import generate_password_hash, check_password_hash
-from functools import wraps
-from dotenv import load_dotenv
+from functools import wraps, lru_cache
+from contextlib import contextmanager
 import sqlite3
-import os
 import csv
+import codecs
 import io
 from datetime import datetime, timedelta
 import requests
 import re
 import time as _time
 import random
+import itertools
+import bisect
+import queue
+import threading
+import uuid
+import hashlib
+import atexit
+import sys
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+import orjson
 import xml.etree.ElementTree as ET
 from typing import List, Dict, Optional
 from urllib.parse import urljoin, urlparse
 
-load_dotenv()
-
 app = Flask(__name__, static_folder='static', static_url_path='/static')
 app.secret_key = os.environ.get('SECRET_KEY', '')
 if not app.secret_key:
     raise RuntimeError('SECRET_KEY environment variable is required. Copy .env.example to .env and set it.')
 CORS(app, supports_credentials=True)
-socketio = SocketIO(app, cors_allowed_origins="*", async_mode='threading')
 
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
@@ -34,13 +59,208 @@ DB_FILE = 'prospects.db'
 FIRECRAWL_API_KEY = os.environ.get('FIRECRAWL_API_KEY', '')
 FIRECRAWL_BASE_URL = 'https://api.firecrawl.dev/v1'
 
+# ─── JSON Serialization ──────────────────────────────────────────────────────
+
+def _json_default(obj):
+    # sqlite3.Row results can be serialized directly without a dict(row) pass first
+    if isinstance(obj, sqlite3.Row):
+        return dict(obj)
+    return DefaultJSONProvider.default(obj)
+
+def _orjson_dumps(obj) -> bytes:
+    return orjson.dumps(obj, default=_json_default, option=orjson.OPT_NON_STR_KEYS)
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson. Types orjson can't handle natively
+    fall through to Flask's default encoder hook."""
+
+    def dumps(self, obj, **kwargs):
+        return _orjson_dumps(obj).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(_orjson_dumps(obj), mimetype=self.mimetype)
+
+app.json = OrjsonProvider(app)
+
+class OrjsonModule:
+    """json-module shim so Socket.IO packets are encoded with orjson as well."""
+
+    @staticmethod
+    def dumps(obj, **kwargs):
+        return _orjson_dumps(obj).decode()
+
+    @staticmethod
+    def loads(s, **kwargs):
+        return orjson.loads(s)
+
+def stream_json_rows(conn, cursor, row_fn=dict, extra=None, batch_size=500):
+    """Stream an executed cursor as {"success": true, "data": [...], **extra}.
+    Rows are pulled with fetchmany so only one batch is held in memory, and the
+    connection is closed once the generator is exhausted."""
+    def generate():
+        try:
+            yield b'{"success":true,"data":['
+            sep = b''
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield sep + b','.join(_orjson_dumps(row_fn(row)) for row in rows)
+                sep = b','
+            yield b']'
+            for key, value in (extra or {}).items():
+                yield b',' + _orjson_dumps(key) + b':' + _orjson_dumps(value)
+            yield b'}'
+        finally:
+            conn.close()
+    return Response(stream_with_context(generate()), mimetype='application/json')
+
+# ─── Socket.IO ───────────────────────────────────────────────────────────────
+
+# Set SOCKETIO_MESSAGE_QUEUE (e.g. redis://localhost:6379/0) when running several
+# workers so broadcasts reach sockets connected to the other processes
+SOCKETIO_MESSAGE_QUEUE = os.environ.get('SOCKETIO_MESSAGE_QUEUE') or None
+socketio = SocketIO(app, cors_allowed_origins="*", async_mode=SOCKETIO_ASYNC_MODE,
+                    message_queue=SOCKETIO_MESSAGE_QUEUE, json=OrjsonModule)
+
+# ─── Timestamps ──────────────────────────────────────────────────────────────
+
+# Chat and report writes stamp rows at millisecond precision
+def fast_now() -> str:
+    return datetime.now().isoformat(timespec='milliseconds')
+
 # ─── Database ────────────────────────────────────────────────────────────────
 
+_wal_enabled = False
+
+def configure_connection(conn):
+    """Per-connection pragmas shared by get_db() and the pool."""
+    global _wal_enabled
+    if not _wal_enabled:
+        # journal_mode is stored in the DB file, so switching once per process is enough
+        conn.execute('PRAGMA journal_mode=WAL')
+        _wal_enabled = True
+    conn.execute('PRAGMA synchronous=NORMAL')
+    conn.execute('PRAGMA wal_autocheckpoint=1000')
+    conn.execute('PRAGMA busy_timeout=5000')
+    conn.execute('PRAGMA temp_store=MEMORY')
+    conn.execute('PRAGMA cache_size=-64000')
+    conn.execute('PRAGMA mmap_size=268435456')
+    return conn
+
+class PooledConnection(sqlite3.Connection):
+    """Connection whose close() hands it back to its pool instead of tearing
+    it down, so the existing `conn.close()` call sites keep working."""
+    pool = None
+    borrower = None
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.release(self)
+        else:
+            super().close()
+
+class SqlitePool:
+    """Bounded pool of long-lived SQLite connections.
+
+    get()/release() (or the acquire() context manager) hand out an idle
+    connection, opening an extra one if the pool is drained so callers never
+    block. Connections beyond `size` are closed instead of pooled."""
+
+    def __init__(self, path: str, size: int = 8):
+        self.path = path
+        # LIFO so the busiest connections, with the warmest page caches, are reused first
+        self._idle = queue.LifoQueue(maxsize=size)
+        for _ in range(size):
+            self._idle.put(self._connect())
+
+    def _connect(self):
+        # Pooled connections live long enough for a big statement cache to pay off
+        conn = sqlite3.connect(self.path, check_same_thread=False, cached_statements=256,
+                               factory=PooledConnection)
+        conn.row_factory = sqlite3.Row
+        conn.pool = self
+        return configure_connection(conn)
+
+    def get(self):
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            conn = self._connect()
+        conn.borrower = object()
+        return conn
+
+    def release(self, conn):
+        if conn.borrower is None:
+            return  # already returned
+        conn.borrower = None
+        # Never hand the next caller a half-finished transaction
+        if conn.in_transaction:
+            conn.rollback()
+        try:
+            self._idle.put_nowait(conn)
+        except queue.Full:
+            sqlite3.Connection.close(conn)
+
+    @contextmanager
+    def acquire(self):
+        conn = self.get()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def optimize(self):
+        """Run PRAGMA optimize on every idle connection. SQLite advises it at
+        close so the planner's stats track the queries each connection ran;
+        pooled connections never close, so this runs at exit instead."""
+        for conn in list(self._idle.queue):
+            try:
+                conn.execute('PRAGMA optimize')
+            except sqlite3.Error:
+                pass
+
+db_pool = SqlitePool(DB_FILE)
+atexit.register(db_pool.optimize)
+
 def get_db():
-    conn = sqlite3.connect(DB_FILE)
-    conn.row_factory = sqlite3.Row
+    """Borrow a pooled connection; conn.close() gives it back. Anything a
+    request forgets to close is returned when the app context tears down."""
+    conn = db_pool.get()
+    if has_app_context():
+        g.setdefault('_db_borrowed', []).append((conn, conn.borrower))
     return conn
 
+@app.teardown_appcontext
+def release_leaked_db(exc):
+    for conn, borrower in g.pop('_db_borrowed', ()):
+        # Only if this context still holds it; after close() it may belong to someone else
+        if conn.borrower is borrower:
+            db_pool.release(conn)
+
+# Hot-path statements for moderation and chat. Keeping each one in a single
+# constant guarantees every call site hits the connection's statement cache.
+SQL_COMMENT_EXISTS = 'SELECT 1 FROM forum_comments WHERE id = ?'
+SQL_UPDATE_COMMENT_BODY = 'UPDATE forum_comments SET body = ? WHERE id = ? AND (user_id = ? OR ?)'
+SQL_DELETE_COMMENT = 'DELETE FROM forum_comments WHERE id = ? AND (user_id = ? OR ?)'
+SQL_INSERT_REPORT_POST = ('INSERT OR IGNORE INTO forum_reports (post_id, reporter_user_id, reason, created_at) '
+                          'VALUES (?,?,?,?)')
+SQL_INSERT_REPORT_COMMENT = ('INSERT OR IGNORE INTO forum_reports (comment_id, reporter_user_id, reason, created_at) '
+                             'VALUES (?,?,?,?)')
+SQL_UPDATE_POST_REPORTED = 'UPDATE forum_posts SET is_reported = 1 WHERE id = ? AND is_reported = 0'
+SQL_UPDATE_COMMENT_REPORTED = 'UPDATE forum_comments SET is_reported = 1 WHERE id = ? AND is_reported = 0'
+SQL_PENDING_REPORTS_STATE = 'SELECT COUNT(*) AS cnt, MAX(created_at) AS newest FROM forum_reports WHERE status = ?'
+SQL_PENDING_REPORTS_PAGE = ('SELECT * FROM forum_reports WHERE status = ? '
+                            'AND (created_at < ? OR (created_at = ? AND id < ?)) '
+                            'ORDER BY created_at DESC, id DESC LIMIT ?')
+SQL_UPDATE_REPORT_STATUS = 'UPDATE forum_reports SET status = ? WHERE id = ?'
+SQL_INSERT_CHAT = 'INSERT INTO chat_messages (id, username, message, timestamp) VALUES (?, ?, ?, ?)'
+SQL_INSERT_CHAT_AUTO_ID = 'INSERT INTO chat_messages (username, message, timestamp) VALUES (?, ?, ?)'
+
 def init_db():
     conn = get_db()
     c = conn.cursor()
@@ -71,6 +291,11 @@ def init_db():
     # Add phone column if upgrading from older schema
     if not column_exists(c, 'prospects', 'phone'):
         c.execute('ALTER TABLE prospects ADD COLUMN phone TEXT')
+    # Covers the status counts and pipeline sum in get_stats without touching the table
+    c.execute('CREATE INDEX IF NOT EXISTS idx_prospects_status_deal ON prospects(status, deal_size)')
+    # Expression indexes for check_duplicate's case-insensitive lookups
+    c.execute('CREATE INDEX IF NOT EXISTS idx_prospects_email_lc ON prospects(LOWER(email))')
+    c.execute('CREATE INDEX IF NOT EXISTS idx_prospects_company_lc ON prospects(LOWER(company))')
 
     c.execute('''CREATE TABLE IF NOT EXISTS tasks (
         id TEXT PRIMARY KEY,
@@ -82,6 +307,9 @@ def init_db():
         created_at TEXT,
         FOREIGN KEY (prospect_id) REFERENCES prospects(id)
     )''')
+    c.execute('CREATE INDEX IF NOT EXISTS idx_tasks_status_due ON tasks(status, due_date)')
+    # A prospect's tasks, already in due-date order
+    c.execute('CREATE INDEX IF NOT EXISTS idx_tasks_prospect_due ON tasks(prospect_id, due_date)')
 
     c.execute('''CREATE TABLE IF NOT EXISTS chat_messages (
         id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -89,6 +317,8 @@ def init_db():
         message TEXT,
         timestamp TEXT
     )''')
+    # Chat history is read newest-first with a LIMIT
+    c.execute('CREATE INDEX IF NOT EXISTS idx_chat_timestamp ON chat_messages(timestamp DESC)')
 
     c.execute('''CREATE TABLE IF NOT EXISTS users (
         id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -121,6 +351,8 @@ def init_db():
         FOREIGN KEY (post_id) REFERENCES forum_posts(id),
         FOREIGN KEY (user_id) REFERENCES users(id)
     )''')
+    # Per-post comment counts and comment threads are read by post_id
+    c.execute('CREATE INDEX IF NOT EXISTS idx_forum_comments_post_created ON forum_comments(post_id, created_at)')
 
     # The Sauce - Signal-based trigger alerts (cached daily)
     c.execute('''CREATE TABLE IF NOT EXISTS sauce_alerts (
@@ -134,6 +366,8 @@ def init_db():
         created_at TEXT,
         date_key TEXT
     )''')
+    # get_sauce's cache check: one day's alerts, newest first
+    c.execute('CREATE INDEX IF NOT EXISTS idx_sauce_datekey_id ON sauce_alerts(date_key, id DESC)')
 
     # Questing Engine - XP tracking
     c.execute('''CREATE TABLE IF NOT EXISTS xp_log (
@@ -143,6 +377,11 @@ def init_db():
         detail TEXT,
         created_at TEXT
     )''')
+    # Running XP per user, kept in step with xp_log by flush_xp (user_id 0 = rows without a user)
+    c.execute('''CREATE TABLE IF NOT EXISTS xp_totals (
+        user_id INTEGER PRIMARY KEY,
+        total INTEGER NOT NULL DEFAULT 0
+    )''')
 
     # ─── Accounts (company normalization) ─────────────────────────────────
     c.execute('''CREATE TABLE IF NOT EXISTS accounts (
@@ -293,6 +532,20 @@ def init_db():
         FOREIGN KEY (comment_id) REFERENCES forum_comments(id) ON DELETE CASCADE,
         FOREIGN KEY (reporter_user_id) REFERENCES users(id)
     )''')
+    # id breaks created_at ties so keyset pages never skip reports filed in the same millisecond
+    c.execute('DROP INDEX IF EXISTS idx_reports_status_created')
+    c.execute('CREATE INDEX IF NOT EXISTS idx_reports_status_created_id '
+              'ON forum_reports(status, created_at DESC, id DESC)')
+    # One report per user per post/comment; drop older duplicates before the unique indexes go on
+    c.execute("SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'idx_reports_unique_post'")
+    if not c.fetchone():
+        for col in ('post_id', 'comment_id'):
+            c.execute(f'''DELETE FROM forum_reports WHERE {col} IS NOT NULL AND id NOT IN
+                         (SELECT MIN(id) FROM forum_reports WHERE {col} IS NOT NULL GROUP BY {col}, reporter_user_id)''')
+    c.execute('''CREATE UNIQUE INDEX IF NOT EXISTS idx_reports_unique_post
+                 ON forum_reports(post_id, reporter_user_id) WHERE post_id IS NOT NULL''')
+    c.execute('''CREATE UNIQUE INDEX IF NOT EXISTS idx_reports_unique_comment
+                 ON forum_reports(comment_id, reporter_user_id) WHERE comment_id IS NOT NULL''')
 
     # Migrate existing tables (add new columns)
     migrations = [
@@ -313,6 +566,9 @@ def init_db():
         if not column_exists(c, table, col):
             c.execute(f'ALTER TABLE {table} ADD COLUMN {col} {col_type}')
 
+    # Indexes on migrated columns (must run after the ALTERs above)
+    c.execute('CREATE INDEX IF NOT EXISTS idx_prospects_account_deal ON prospects(account_id, deal_size)')
+
     conn.commit()
     conn.close()
 
@@ -320,6 +576,18 @@ init_db()
 
 # ─── Challenge Rotation ──────────────────────────────────────────────────────
 
+# /api/xp only changes when an XP batch is flushed, the challenges rotate or
+# the day rolls over, so each user's body is cached per version and date and a
+# poll carrying the matching ETag gets a 304. Versions are per process, so with
+# several workers nothing is cached; they start from the clock so an ETag from
+# before a restart can't match.
+_xp_cache = {'version': _time.time_ns(), 'bodies': {}}
+
+def invalidate_xp_cache():
+    """Drop every cached /api/xp body; called after XP flushes and challenge rotation."""
+    _xp_cache['version'] += 1
+    _xp_cache['bodies'] = {}
+
 def rotate_challenges():
     """Pick a fresh set of active challenges: 4 daily + 2 weekly = 6 total.
     Rotates once per calendar day using a date-based seed for consistency."""
@@ -352,6 +620,8 @@ def rotate_challenges():
 
     conn.commit()
     conn.close()
+    # Cached /api/xp bodies still list the old challenge set
+    invalidate_xp_cache()
 
 # Run rotation on startup so challenges are always populated
 rotate_challenges()
@@ -369,21 +639,110 @@ def login_required(f):
 def get_current_user():
     if 'user_id' not in session:
         return None
-    conn = get_db()
-    c = conn.cursor()
-    c.execute('SELECT id, username, email, display_name, avatar, signature FROM users WHERE id = ?', (session['user_id'],))
-    user = c.fetchone()
-    conn.close()
+    with db_pool.acquire() as conn:
+        user = conn.execute('SELECT id, username, email, display_name, avatar, signature FROM users WHERE id = ?',
+                            (session['user_id'],)).fetchone()
     return dict(user) if user else None
 
+# Roles are cached in the session so moderator checks skip the users lookup.
+# The cached role is re-read after ROLE_CACHE_TTL seconds, which bounds how long
+# a demoted moderator keeps their rights and behaves the same on every worker.
+ROLE_CACHE_TTL = int(os.environ.get('ROLE_CACHE_TTL', 60))
+
+def remember_role(role):
+    session['role'] = role
+    session['role_checked_at'] = _time.time()
+
+def current_role():
+    if _time.time() - session.get('role_checked_at', 0) > ROLE_CACHE_TTL:
+        conn = get_db()
+        row = conn.execute('SELECT role FROM users WHERE id = ?', (session.get('user_id'),)).fetchone()
+        conn.close()
+        remember_role(row['role'] if row else None)
+    return session.get('role')
+
+def is_moderator():
+    return current_role() in ('admin', 'moderator')
+
 AVATAR_OPTIONS = [
     'avatar-default', 'avatar-hacker', 'avatar-ghost', 'avatar-skull',
     'avatar-robot', 'avatar-alien', 'avatar-ninja', 'avatar-wizard',
     'avatar-dragon', 'avatar-phoenix', 'avatar-wolf', 'avatar-eagle'
 ]
+# Membership checks in register/update_profile; the list keeps the display order
+_AVATAR_SET = frozenset(AVATAR_OPTIONS)
 
 # ─── Firecrawl Client ────────────────────────────────────────────────────────
 
+# Successful scrape/crawl responses are reused for SCRAPE_CACHE_TTL seconds so
+# repeat searches of the same site skip Firecrawl (and crawl polling) entirely.
+# Set SCRAPE_CACHE_URL (e.g. redis://localhost:6379/1) to share the cache
+# between workers; otherwise each process keeps its own.
+SCRAPE_CACHE_TTL = int(os.environ.get('SCRAPE_CACHE_TTL', 6 * 3600))
+SCRAPE_CACHE_URL = os.environ.get('SCRAPE_CACHE_URL') or None
+SCRAPE_CACHE_MAX_ENTRIES = 256
+
+class ScrapeCache:
+    def __init__(self, ttl: int, url: str = None):
+        self.ttl = ttl
+        self.redis = None
+        self.redis_error = ()
+        if url:
+            import redis
+            self.redis = redis.Redis.from_url(url)
+            self.redis_error = redis.exceptions.RedisError
+        self._local = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(kind: str, payload: Dict) -> str:
+        digest = hashlib.sha1(orjson.dumps(payload, option=orjson.OPT_SORT_KEYS)).hexdigest()
+        return f'fc:{kind}:{digest}'
+
+    def get(self, key: str):
+        if self.ttl <= 0:
+            return None
+        if self.redis is not None:
+            try:
+                cached = self.redis.get(key)
+            except self.redis_error as e:
+                print(f"Scrape cache read failed: {e}")
+                return None
+            return orjson.loads(cached) if cached else None
+        with self._lock:
+            entry = self._local.get(key)
+            if entry and entry[0] > _time.monotonic():
+                return orjson.loads(entry[1])
+            self._local.pop(key, None)
+        return None
+
+    def set(self, key: str, value: Dict):
+        if self.ttl <= 0 or not value:
+            return
+        data = orjson.dumps(value)
+        if self.redis is not None:
+            try:
+                self.redis.setex(key, self.ttl, data)
+            except self.redis_error as e:
+                print(f"Scrape cache write failed: {e}")
+            return
+        with self._lock:
+            if len(self._local) >= SCRAPE_CACHE_MAX_ENTRIES:
+                now = _time.monotonic()
+                for k in [k for k, (exp, _) in self._local.items() if exp <= now]:
+                    del self._local[k]
+                while len(self._local) >= SCRAPE_CACHE_MAX_ENTRIES:
+                    del self._local[next(iter(self._local))]
+            self._local[key] = (_time.monotonic() + self.ttl, data)
+
+scrape_cache = ScrapeCache(SCRAPE_CACHE_TTL, SCRAPE_CACHE_URL)
+
+# Cap on in-flight Firecrawl requests per process, so a burst of searches
+# queues here instead of tripping Firecrawl's own rate limiting
+FIRECRAWL_MAX_CONCURRENCY = int(os.environ.get('FIRECRAWL_MAX_CONCURRENCY', 3))
+CRAWL_POLL_TIMEOUT = 60
+CRAWL_POLL_MAX_INTERVAL = 8
+
 class FirecrawlClient:
     def __init__(self, api_key: str):
         self.api_key = api_key
@@ -392,23 +751,44 @@ class FirecrawlClient:
             'Authorization': f'Bearer {api_key}',
             'Content-Type': 'application/json'
         }
-
-    def scrape_url(self, url: str, formats: List[str] = None) -> Dict:
+        # One session per client keeps the TLS connection to Firecrawl alive
+        # across scrape calls and crawl polls
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        self._slots = threading.BoundedSemaphore(FIRECRAWL_MAX_CONCURRENCY)
+
+    def _request(self, method: str, url: str, **kwargs):
+        with self._slots:
+            return self.session.request(method, url, **kwargs)
+
+    def scrape_url(self, url: str, formats: List[str] = None, use_cache: bool = False) -> Dict:
+        """use_cache serves and stores results in scrape_cache; callers that
+        need fresh content (sauce refresh, icebreakers) leave it off."""
         if formats is None:
             formats = ['markdown', 'html']
         endpoint = f'{self.base_url}/scrape'
         payload = {'url': url, 'formats': formats}
+        cache_key = ScrapeCache.key('scrape', payload)
+        if use_cache:
+            cached = scrape_cache.get(cache_key)
+            if cached is not None:
+                return cached
         try:
-            response = requests.post(endpoint, json=payload, headers=self.headers, timeout=30)
+            response = self._request('POST', endpoint, json=payload, timeout=30)
             response.raise_for_status()
-            return response.json()
+            result = response.json()
+            if use_cache:
+                scrape_cache.set(cache_key, result)
+            return result
         except requests.exceptions.RequestException as e:
             print(f"Error scraping {url}: {str(e)}")
             return None
 
-    def crawl_website(self, url: str, limit: int = 10, scrape_options: Dict = None) -> Dict:
-        """Firecrawl v1 crawl is async - submit job, then poll for results."""
-        import time
+    def crawl_website(self, url: str, limit: int = 10, scrape_options: Dict = None, on_pages=None,
+                      use_cache: bool = False) -> Dict:
+        """Firecrawl v1 crawl is async - submit job, then poll for results.
+        on_pages, if given, is called with each batch of newly finished pages.
+        use_cache serves and stores results in scrape_cache, as scrape_url does."""
         endpoint = f'{self.base_url}/crawl'
         payload = {
             'url': url,
@@ -418,15 +798,31 @@ class FirecrawlClient:
                 'onlyMainContent': True
             }
         }
+        reported = 0
+
+        def report(pages):
+            nonlocal reported
+            if on_pages and pages and len(pages) > reported:
+                on_pages(pages[reported:])
+                reported = len(pages)
+
+        cache_key = ScrapeCache.key('crawl', payload)
+        cached = scrape_cache.get(cache_key) if use_cache else None
+        if cached is not None:
+            report(cached.get('data'))
+            return cached
         try:
             # Step 1: Submit the crawl job
-            response = requests.post(endpoint, json=payload, headers=self.headers, timeout=30)
+            response = self._request('POST', endpoint, json=payload, timeout=30)
             response.raise_for_status()
             job_data = response.json()
             print(f"Crawl job response: {job_data}")
 
             # If the API returned data directly (v0 style), return as-is
             if 'data' in job_data and isinstance(job_data['data'], list):
+                if use_cache:
+                    scrape_cache.set(cache_key, job_data)
+                report(job_data['data'])
                 return job_data
 
             # Step 2: Poll for results using the job ID
@@ -441,16 +837,29 @@ class FirecrawlClient:
                     return None
 
             check_url = f'{self.base_url}/crawl/{job_id}'
-            max_attempts = 30  # Poll for up to ~60 seconds
-            for attempt in range(max_attempts):
-                time.sleep(2)
-                status_response = requests.get(check_url, headers=self.headers, timeout=15)
+            # Poll for up to ~60 seconds, backing off 1s, 2s, 4s then every 8s so
+            # small crawls return quickly and long ones aren't over-polled
+            deadline = _time.monotonic() + CRAWL_POLL_TIMEOUT
+            interval = 1
+            attempt = 0
+            while _time.monotonic() < deadline:
+                # Cooperative sleep: under eventlet the worker serves other
+                # requests while this crawl waits on Firecrawl
+                socketio.sleep(interval)
+                interval = min(interval * 2, CRAWL_POLL_MAX_INTERVAL)
+                attempt += 1
+                status_response = self._request('GET', check_url, timeout=15)
                 status_response.raise_for_status()
                 status_data = status_response.json()
-                print(f"Crawl poll attempt {attempt + 1}: status={status_data.get('status')}")
+                print(f"Crawl poll attempt {attempt}: status={status_data.get('status')}")
 
                 status = status_data.get('status', '')
+                if status != 'failed':
+                    # In-progress responses already carry the pages finished so far
+                    report(status_data.get('data'))
                 if status == 'completed':
+                    if use_cache:
+                        scrape_cache.set(cache_key, status_data)
                     return status_data
                 elif status == 'failed':
                     print(f"Crawl job failed: {status_data}")
@@ -468,101 +877,238 @@ class FirecrawlClient:
         endpoint = f'{self.base_url}/map'
         payload = {'url': url}
         try:
-            response = requests.post(endpoint, json=payload, headers=self.headers, timeout=30)
+            response = self._request('POST', endpoint, json=payload, timeout=30)
             response.raise_for_status()
             return response.json()
         except requests.exceptions.RequestException as e:
             print(f"Error mapping {url}: {str(e)}")
             return None
 
+# Shared by every route so connections are pooled process-wide
+firecrawl = FirecrawlClient(FIRECRAWL_API_KEY)
+# Same for the other outbound APIs (news, quotes, enrichment)
+http_session = requests.Session()
+
 # ─── Prospect Extraction (FIXED dedup) ───────────────────────────────────────
 
+# Patterns are compiled once here; extraction runs on every scraped/crawled page
+_EMAIL_RE = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+_PHONE_RE = re.compile(r'\b(?:\+?1[-.\s]?)?\(?([0-9]{3})\)?[-.\s]?([0-9]{3})[-.\s]?([0-9]{4})\b')
+_PHONE_LOOSE_RE = re.compile(r'[\(]?\d{3}[\).\-\s]?\s*\d{3}[\-.\s]\d{4}')
+_LINKEDIN_PERSON_RE = re.compile(r'https?://(?:www\.)?linkedin\.com/in/[\w-]+', re.IGNORECASE)
+_LINKEDIN_COMPANY_RE = re.compile(r'https?://(?:www\.)?linkedin\.com/company/[\w-]+', re.IGNORECASE)
+_LINKEDIN_HTML_RE = re.compile(r'https?://(?:www\.)?linkedin\.com/in/[^\s"\'<>]+')
+_LINKEDIN_MD_RE = re.compile(r'https?://(?:www\.)?linkedin\.com/in/[^\s)]+')
+
+_SCRIPT_RE = re.compile(r'<script[^>]*>.*?</script>', re.DOTALL | re.IGNORECASE)
+_STYLE_RE = re.compile(r'<style[^>]*>.*?</style>', re.DOTALL | re.IGNORECASE)
+_CARD_SPLIT_RE = re.compile(r'<(?:div|section|article|li|td|figure)[^>]*>', re.IGNORECASE)
+_CARD_NAME_RE = re.compile(r'\b([A-Z][a-z]{1,15}(?:\s+[A-Z]\.?)?\s+[A-Z][a-z]{1,20}(?:\s+[A-Z][a-z]{1,20})?)\b')
+_TAG_RE = re.compile(r'<[^>]+>')
+_WHITESPACE_RE = re.compile(r'\s+')
+_HEADING_NAME_RE = re.compile(r'\n#{2,4}\s+([A-Z][a-z]+ [A-Z][a-z]+(?: [A-Z][a-z]+)?)\s*$', re.MULTILINE)
+_JSONLD_RE = re.compile(r'<script[^>]*type=["\']application/ld\+json["\'][^>]*>(.*?)</script>', re.DOTALL | re.IGNORECASE)
+
+_MD_LINK_LINKEDIN_RE = re.compile(r'\[([^\]]*)\]\((https?://(?:www\.)?linkedin\.com/[^)]+)\)')
+_MD_LINK_RE = re.compile(r'\[([^\]]*)\]\([^)]+\)')
+_MD_IMAGE_RE = re.compile(r'!\[([^\]]*)\]\([^)]+\)')
+_MD_BOLD_RE = re.compile(r'\*\*([^*]+)\*\*')
+_MD_ITALIC_RE = re.compile(r'\*([^*]+)\*')
+_MD_BOLD_UNDERSCORE_RE = re.compile(r'__([^_]+)__')
+_MD_ITALIC_UNDERSCORE_RE = re.compile(r'_([^_]+)_')
+
+def _group_1(m):
+    return m.group(1)
+
+def _group_1_space_2(m):
+    return f'{m.group(1)} {m.group(2)}'
+
+# Name pattern: 2-3 capitalized words separated by single spaces, at start of line.
+# Uses [^\S\n]* for leading indent (no newline), single space between name words.
+# Downstream filters (_is_real_person_name and the title-or-company gate)
+# handle false positives.
+_NAME_RE = re.compile(r'\n[^\S\n]*([A-Z][a-z]+ [A-Z][a-z]+(?: [A-Z][a-z]+)?)\b')
+_TWO_WORD_NAME_RE = re.compile(r'^[A-Z][a-z]+ [A-Z][a-z]+$')
+
+# _NAME_RE and _HEADING_NAME_RE anchor on a literal '\n' rather than ^ so re can
+# jump between newlines instead of trying every offset. Scanning '\n' + content
+# covers the first line; positions come back relative to content, with the
+# start on the line's newline (0 for the first line) as ^|\n used to give.
+def _line_matches(pattern, content: str):
+    for match in pattern.finditer('\n' + content):
+        yield max(match.start() - 1, 0), match.end() - 1, match.group(1)
+
+# Title-only patterns to reject, as one alternation
+_TITLE_ONLY_RE = re.compile('|'.join((
+    r'^(?:Chief\s+\w+\s+Officer)$',
+    r'^(?:Vice\s+President(?:\s+of\s+\w+)?)$',
+    r'^(?:Director\s+of\s+\w+)$',
+    r'^(?:Head\s+of\s+\w+)$',
+    r'^(?:Senior|Junior|Lead|Principal)\s+(?:Engineer|Developer|Designer|Architect|Manager|Consultant)$',
+)), re.IGNORECASE)
+
+# Common false positives, matched case-sensitively against the whole name and each word
+_SKIP_NAMES = frozenset([
+    'LinkedIn', 'Apple', 'Google', 'Facebook', 'Adobe', 'MongoDB', 'Kong',
+    'FoundationDB', 'Visual', 'Sciences', 'Fire', 'Darkness', 'Ring', 'Test', 'Contact',
+    'Backstory', 'Leadership', 'Careers', 'Brand', 'Fintech', 'Blockchain', 'Databases',
+    'Cloud', 'Distributed', 'Reliability', 'Glossary', 'Cost', 'Outages', 'Deterministic',
+    'Simulation', 'Property', 'Based', 'Autonomous', 'Testing', 'Techniques', 'Catalog',
+    'Blockchains', 'Acid', 'Compliance', 'Services', 'Experience', 'Problems', 'Security',
+    'Manifesto', 'Stories', 'Working', 'Antithesis', 'Primer', 'Read More', 'Learn More',
+    'About Us', 'Our Team', 'Join Us', 'See All', 'View All', 'Show More',
+    'Chief Executive', 'Chief Technology', 'Chief Financial', 'Chief Operating',
+    'Chief Marketing', 'Chief Revenue', 'Chief Product', 'Chief Information',
+    'Vice President', 'General Manager', 'Managing Director', 'Privacy Policy',
+    'Terms Of', 'All Rights', 'Follow Us', 'Get Started', 'Sign Up', 'Log In'
+])
+
+_TITLE_FIRST_WORDS = frozenset(['Chief', 'Vice', 'Senior', 'Junior', 'Lead', 'Principal',
+                                'Director', 'Manager', 'Head', 'General', 'Managing'])
+
+def _is_real_person_name(name_str: str) -> bool:
+    """Check if a matched string looks like a real person name (not a title or nav text)."""
+    words = name_str.split()
+    if len(words) < 2 or name_str in _SKIP_NAMES or words[0] in _TITLE_FIRST_WORDS:
+        return False
+    # Also check if ANY individual word is a known skip word
+    if not _SKIP_NAMES.isdisjoint(words):
+        return False
+    return not _TITLE_ONLY_RE.match(name_str)
+
+_COMPANY_KEYWORDS = ['Inc', 'Corp', 'LLC', 'Ltd', 'Company', 'Co.', 'Technologies', 'Solutions', 'Services']
+_COMPANY_RES = {kw: re.compile(rf'([A-Z][a-zA-Z0-9\s&]*?{kw})') for kw in _COMPANY_KEYWORDS}
+# Case-sensitive, like the `keyword in context` checks it guards
+_COMPANY_KEYWORD_RE = re.compile('|'.join(map(re.escape, _COMPANY_KEYWORDS)))
+
+# Title keyword sets, each with a single case-insensitive alternation so a
+# line is checked against every keyword in one regex pass
+_TITLE_KEYWORDS = [
+    'CEO', 'CTO', 'CFO', 'COO', 'CMO', 'VP', 'Director', 'Manager',
+    'Head of', 'Lead', 'Engineer', 'Developer', 'Designer', 'Founder',
+    'President', 'Chief', 'Officer', 'Executive', 'Consultant',
+    'Architect', 'Principal', 'Senior', 'Junior', 'Associate', 'Co-founder',
+    'Controller', 'Partner', 'Analyst', 'Coordinator', 'Specialist',
+    'Recruiter', 'Advisor', 'Strategist'
+]
+_TITLE_KEYWORD_RE = re.compile('|'.join(map(re.escape, _TITLE_KEYWORDS)), re.IGNORECASE)
+
+_CARD_TITLE_KEYWORDS = [
+    'ceo', 'cto', 'cfo', 'coo', 'cmo', 'vp', 'director', 'manager',
+    'head of', 'lead', 'engineer', 'developer', 'designer', 'founder',
+    'president', 'chief', 'officer', 'executive', 'consultant',
+    'architect', 'principal', 'senior', 'partner', 'analyst', 'coordinator',
+    'specialist', 'recruiter', 'advisor', 'strategist', 'associate', 'co-founder',
+    'controller', 'managing'
+]
+_CARD_TITLE_KEYWORD_RE = re.compile('|'.join(map(re.escape, _CARD_TITLE_KEYWORDS)), re.IGNORECASE)
+
+_HEADING_TITLE_KEYWORDS = [
+    'ceo', 'cto', 'cfo', 'coo', 'cmo', 'vp', 'director', 'manager',
+    'head of', 'lead', 'founder', 'president', 'chief', 'officer', 'partner',
+    'executive', 'principal', 'senior', 'associate', 'co-founder', 'analyst'
+]
+_HEADING_TITLE_KEYWORD_RE = re.compile('|'.join(map(re.escape, _HEADING_TITLE_KEYWORDS)), re.IGNORECASE)
+
+# Lowercased once here; the extractors below only lowercase the text they test
+_ROLE_EMAIL_MARKERS = ('noreply', 'no-reply', 'support', 'info@', 'hello@')
+_CONFIDENCE_TITLE_KEYWORDS = ('ceo', 'cto', 'vp', 'director', 'manager', 'head', 'lead', 'founder', 'president', 'cfo', 'coo')
+_CARD_SKIP_WORDS = ('privacy', 'policy', 'terms', 'copyright', 'contact', 'about', 'learn',
+                    'read', 'more', 'view', 'sign', 'join', 'follow', 'get', 'started')
+_CARD_TITLE_FIRST_WORDS = frozenset(['chief', 'vice', 'senior', 'junior', 'lead', 'principal', 'director',
+                                     'manager', 'head', 'general', 'managing'])
+
+@dataclass(slots=True)
+class RawProspect:
+    """A prospect as pulled off a page. Slotted so a large crawl doesn't carry a
+    dict per row; orjson serializes it as an object, so routes and socket
+    events return these as-is."""
+    name: str
+    title: Optional[str]
+    company: Optional[str]
+    email: Optional[str]
+    linkedin_url: Optional[str]
+    source: str
+    phone: Optional[str] = None
+    confidence: int = 0
+
+def _new_prospect(name, title, company, email, linkedin_url, source_url, phone=None) -> RawProspect:
+    # Sources and titles repeat across a crawl's prospects; keep one copy of each
+    if title:
+        title = sys.intern(title)
+    prospect = RawProspect(name, title, company, email, linkedin_url, sys.intern(source_url), phone)
+    prospect.confidence = calculate_extraction_confidence(prospect)
+    return prospect
+
+def find_email(text: str, pos: int = 0, endpos: int = None) -> Optional[str]:
+    """First address in text[pos:endpos] that isn't a role/no-reply inbox, else
+    the first one. Stops scanning at the first personal address."""
+    if endpos is None:
+        endpos = len(text)
+    if text.find('@', pos, endpos) < 0:
+        return None
+    first = None
+    for m in _EMAIL_RE.finditer(text, pos, endpos):
+        e = m.group(0)
+        e_lower = e.lower()
+        if not any(marker in e_lower for marker in _ROLE_EMAIL_MARKERS):
+            return e
+        if first is None:
+            first = e
+    return first
+
 def extract_contact_info(text: str) -> Dict[str, Optional[str]]:
-    contact_info = {'email': None, 'phone': None, 'linkedin': None}
-
-    email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-    emails = re.findall(email_pattern, text)
-    if emails:
-        personal_emails = [e for e in emails if not any(skip in e.lower() for skip in ['noreply', 'no-reply', 'support', 'info@', 'hello@'])]
-        contact_info['email'] = personal_emails[0] if personal_emails else emails[0]
-
-    phone_pattern = r'\b(?:\+?1[-.\s]?)?\(?([0-9]{3})\)?[-.\s]?([0-9]{3})[-.\s]?([0-9]{4})\b'
-    phones = re.findall(phone_pattern, text)
-    if phones:
-        contact_info['phone'] = '-'.join(phones[0])
-
-    linkedin_pattern = r'https?://(?:www\.)?linkedin\.com/in/[\w-]+'
-    linkedins = re.findall(linkedin_pattern, text, re.IGNORECASE)
-    if linkedins:
-        contact_info['linkedin'] = linkedins[0]
-    else:
-        linkedin_company_pattern = r'https?://(?:www\.)?linkedin\.com/company/[\w-]+'
-        company_linkedins = re.findall(linkedin_company_pattern, text, re.IGNORECASE)
-        if company_linkedins:
-            contact_info['linkedin'] = company_linkedins[0]
-
-    return contact_info
-
-def extract_linkedin_from_text(text: str) -> Optional[str]:
-    linkedin_pattern = r'https?://(?:www\.)?linkedin\.com/in/[\w-]+'
-    matches = re.findall(linkedin_pattern, text, re.IGNORECASE)
-    if matches:
-        return matches[0]
-    linkedin_company_pattern = r'https?://(?:www\.)?linkedin\.com/company/[\w-]+'
-    company_matches = re.findall(linkedin_company_pattern, text, re.IGNORECASE)
-    if company_matches:
-        return company_matches[0]
-    return None
-
-def calculate_extraction_confidence(prospect: dict) -> int:
+    phone_match = _PHONE_RE.search(text)
+    return {
+        'email': find_email(text),
+        'phone': '-'.join(phone_match.groups()) if phone_match else None,
+        'linkedin': extract_linkedin_from_text(text),
+    }
+
+def extract_linkedin_from_text(text: str, pos: int = 0, endpos: int = None) -> Optional[str]:
+    if endpos is None:
+        endpos = len(text)
+    match = _LINKEDIN_PERSON_RE.search(text, pos, endpos) or _LINKEDIN_COMPANY_RE.search(text, pos, endpos)
+    return match.group(0) if match else None
+
+def calculate_extraction_confidence(prospect: RawProspect) -> int:
     """Score 0-100 based on data completeness and quality of an extracted prospect."""
     score = 0
-    name = prospect.get('name', '')
+    name = prospect.name
     if name and len(name.split()) >= 2:
         score += 25
         if len(name.split()) == 2:
             score += 5
-    if prospect.get('title'):
+    if prospect.title:
         score += 20
-        title_kw = ['CEO', 'CTO', 'VP', 'Director', 'Manager', 'Head', 'Lead', 'Founder', 'President', 'CFO', 'COO']
-        if any(kw.lower() in prospect['title'].lower() for kw in title_kw):
+        title_lower = prospect.title.lower()
+        if any(kw in title_lower for kw in _CONFIDENCE_TITLE_KEYWORDS):
             score += 5
-    if prospect.get('company'):
+    if prospect.company:
         score += 15
-        if prospect['company'] != 'Unknown Company':
+        if prospect.company != 'Unknown Company':
             score += 5
-    if prospect.get('email'):
+    if prospect.email:
         score += 15
-    if prospect.get('linkedin_url'):
+    if prospect.linkedin_url:
         score += 10
     return min(100, score)
 
-def _extract_from_html_cards(html_content: str, source_url: str) -> List[Dict]:
+def _extract_from_html_cards(html_content: str, source_url: str) -> List[RawProspect]:
     """Extract prospects from HTML team/about pages using structural patterns."""
     prospects = []
     if not html_content:
         return prospects
 
-    title_keywords_lower = [
-        'ceo', 'cto', 'cfo', 'coo', 'cmo', 'vp', 'director', 'manager',
-        'head of', 'lead', 'engineer', 'developer', 'designer', 'founder',
-        'president', 'chief', 'officer', 'executive', 'consultant',
-        'architect', 'principal', 'senior', 'partner', 'analyst', 'coordinator',
-        'specialist', 'recruiter', 'advisor', 'strategist', 'associate', 'co-founder',
-        'controller', 'managing'
-    ]
-
     # Strategy: find repeated card-like elements with names and titles
     # Look for text content between tags that matches Name + Title patterns
     # Remove scripts and styles
-    clean_html = re.sub(r'<script[^>]*>.*?</script>', '', html_content, flags=re.DOTALL | re.IGNORECASE)
-    clean_html = re.sub(r'<style[^>]*>.*?</style>', '', clean_html, flags=re.DOTALL | re.IGNORECASE)
+    clean_html = _SCRIPT_RE.sub('', html_content)
+    clean_html = _STYLE_RE.sub('', clean_html)
 
     # Extract text blocks from card-like divs or sections
     # Find all text content, stripping tags
-    text_blocks = re.split(r'<(?:div|section|article|li|td|figure)[^>]*>', clean_html, flags=re.IGNORECASE)
-
-    name_pattern = re.compile(r'\b([A-Z][a-z]{1,15}(?:\s+[A-Z]\.?)?\s+[A-Z][a-z]{1,20}(?:\s+[A-Z][a-z]{1,20})?)\b')
+    text_blocks = _CARD_SPLIT_RE.split(clean_html)
 
     seen_names = set()
 
@@ -570,12 +1116,12 @@ def _extract_from_html_cards(html_content: str, source_url: str) -> List[Dict]:
         if len(block) > 2000 or len(block) < 10:
             continue
         # Strip remaining tags to get text
-        text = re.sub(r'<[^>]+>', ' ', block)
-        text = re.sub(r'\s+', ' ', text).strip()
+        text = _TAG_RE.sub(' ', block)
+        text = _WHITESPACE_RE.sub(' ', text).strip()
         if len(text) < 5 or len(text) > 500:
             continue
 
-        names = name_pattern.findall(text)
+        names = _CARD_NAME_RE.findall(text)
         for name in names:
             name = name.strip()
             if len(name.split()) < 2:
@@ -585,28 +1131,27 @@ def _extract_from_html_cards(html_content: str, source_url: str) -> List[Dict]:
                 continue
 
             # Check it's not a title/company name
-            skip_words = {'privacy', 'policy', 'terms', 'copyright', 'contact', 'about', 'learn',
-                          'read', 'more', 'view', 'sign', 'join', 'follow', 'get', 'started'}
-            if any(w in name_lower for w in skip_words):
+            if any(w in name_lower for w in _CARD_SKIP_WORDS):
                 continue
-            first_word = name.split()[0].lower()
-            title_first = ['chief', 'vice', 'senior', 'junior', 'lead', 'principal', 'director', 'manager', 'head', 'general', 'managing']
-            if first_word in title_first:
+            if name_lower.split()[0] in _CARD_TITLE_FIRST_WORDS:
                 continue
 
-            # Look for title in the same block
+            # Look for title in the same block. Keyword order decides which
+            # phrase is picked, so the loop only runs once a keyword is known to be present.
             title = None
-            for kw in title_keywords_lower:
-                if kw in text.lower():
+            text_lower = text.lower()
+            for kw in (_CARD_TITLE_KEYWORDS if _CARD_TITLE_KEYWORD_RE.search(text) else ()):
+                if kw in text_lower:
                     # Extract the line/phrase containing the keyword
                     for segment in text.split('  '):
                         seg_clean = segment.strip()
-                        if kw in seg_clean.lower() and seg_clean.lower() != name_lower and len(seg_clean) < 150:
+                        seg_lower = seg_clean.lower()
+                        if kw in seg_lower and seg_lower != name_lower and len(seg_clean) < 150:
                             title = seg_clean
                             break
                     if not title:
                         # Try finding title near the keyword
-                        idx = text.lower().find(kw)
+                        idx = text_lower.find(kw)
                         start = max(0, idx - 5)
                         end = min(len(text), idx + 80)
                         candidate = text[start:end].strip()
@@ -616,63 +1161,42 @@ def _extract_from_html_cards(html_content: str, source_url: str) -> List[Dict]:
                         break
 
             # Extract email from block
-            email = None
-            emails = re.findall(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', text)
-            if emails:
-                personal = [e for e in emails if not any(s in e.lower() for s in ['noreply', 'no-reply', 'support', 'info@', 'hello@'])]
-                email = personal[0] if personal else emails[0]
+            email = find_email(text)
 
             # Extract LinkedIn
             linkedin_url = None
-            li_match = re.search(r'https?://(?:www\.)?linkedin\.com/in/[^\s"\'<>]+', block)
+            li_match = _LINKEDIN_HTML_RE.search(block)
             if li_match:
                 linkedin_url = li_match.group(0).rstrip('/')
 
             # Extract phone
             phone = None
-            phone_match = re.search(r'[\(]?\d{3}[\).\-\s]?\s*\d{3}[\-.\s]\d{4}', text)
+            phone_match = _PHONE_LOOSE_RE.search(text)
             if phone_match:
                 phone = phone_match.group(0)
 
             if title or email or linkedin_url or phone:
                 seen_names.add(name_lower)
-                prospect = {
-                    'name': name,
-                    'title': title,
-                    'company': None,
-                    'email': email,
-                    'phone': phone,
-                    'linkedin_url': linkedin_url,
-                    'source': source_url
-                }
-                prospect['confidence'] = calculate_extraction_confidence(prospect)
-                prospects.append(prospect)
+                prospects.append(_new_prospect(name, title, None, email, linkedin_url, source_url, phone))
 
     return prospects
 
-def _extract_from_headings(content: str, source_url: str) -> List[Dict]:
+def _extract_from_headings(content: str, source_url: str) -> List[RawProspect]:
     """Extract prospects from markdown heading patterns (## Name / ### Name)."""
     prospects = []
     if not content:
         return prospects
 
-    title_keywords_lower = [
-        'ceo', 'cto', 'cfo', 'coo', 'cmo', 'vp', 'director', 'manager',
-        'head of', 'lead', 'founder', 'president', 'chief', 'officer', 'partner',
-        'executive', 'principal', 'senior', 'associate', 'co-founder', 'analyst'
-    ]
-
-    heading_pattern = re.compile(r'^#{2,4}\s+([A-Z][a-z]+ [A-Z][a-z]+(?: [A-Z][a-z]+)?)\s*$', re.MULTILINE)
     seen_names = set()
 
-    for match in heading_pattern.finditer(content):
-        name = match.group(1).strip()
+    for _, end, name in _line_matches(_HEADING_NAME_RE, content):
+        name = name.strip()
         name_lower = name.lower()
         if name_lower in seen_names or len(name.split()) < 2:
             continue
 
         # Get context after the heading
-        pos = match.end()
+        pos = end
         context = content[pos:pos + 400]
 
         title = None
@@ -681,45 +1205,36 @@ def _extract_from_headings(content: str, source_url: str) -> List[Dict]:
             line_stripped = line.strip()
             if not line_stripped or line_stripped.startswith('#'):
                 continue
-            for kw in title_keywords_lower:
-                if kw in line_stripped.lower() and len(line_stripped) < 150:
-                    title = line_stripped
-                    break
-            if title:
+            if len(line_stripped) < 150 and _HEADING_TITLE_KEYWORD_RE.search(line_stripped):
+                title = line_stripped
                 break
 
         email = None
-        emails = re.findall(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', context)
-        if emails:
-            email = emails[0]
+        email_match = _EMAIL_RE.search(context)
+        if email_match:
+            email = email_match.group(0)
 
         linkedin_url = None
-        li_match = re.search(r'https?://(?:www\.)?linkedin\.com/in/[^\s)]+', context)
+        li_match = _LINKEDIN_MD_RE.search(context)
         if li_match:
             linkedin_url = li_match.group(0)
 
         if title or email or linkedin_url:
             seen_names.add(name_lower)
-            prospect = {
-                'name': name, 'title': title, 'company': None,
-                'email': email, 'linkedin_url': linkedin_url, 'source': source_url
-            }
-            prospect['confidence'] = calculate_extraction_confidence(prospect)
-            prospects.append(prospect)
+            prospects.append(_new_prospect(name, title, None, email, linkedin_url, source_url))
 
     return prospects
 
-def _extract_from_jsonld(html_content: str, source_url: str) -> List[Dict]:
+def _extract_from_jsonld(html_content: str, source_url: str) -> List[RawProspect]:
     """Extract prospects from JSON-LD schema.org Person data."""
-    import json as _json
     prospects = []
     if not html_content:
         return prospects
 
-    ld_blocks = re.findall(r'<script[^>]*type=["\']application/ld\+json["\'][^>]*>(.*?)</script>', html_content, re.DOTALL | re.IGNORECASE)
+    ld_blocks = _JSONLD_RE.findall(html_content)
     for block in ld_blocks:
         try:
-            data = _json.loads(block)
+            data = orjson.loads(block)
             items = data if isinstance(data, list) else [data]
             for item in items:
                 if item.get('@type') == 'Person' or (isinstance(item.get('@graph'), list)):
@@ -728,30 +1243,24 @@ def _extract_from_jsonld(html_content: str, source_url: str) -> List[Dict]:
                         name = person.get('name', '')
                         if not name or len(name.split()) < 2:
                             continue
-                        prospect = {
-                            'name': name,
-                            'title': person.get('jobTitle'),
-                            'company': None,
-                            'email': person.get('email'),
-                            'linkedin_url': None,
-                            'source': source_url
-                        }
+                        company = None
                         org = person.get('worksFor')
                         if isinstance(org, dict):
-                            prospect['company'] = org.get('name')
+                            company = org.get('name')
                         elif isinstance(org, str):
-                            prospect['company'] = org
+                            company = org
+                        linkedin_url = None
                         for link in (person.get('sameAs') or []):
                             if 'linkedin.com' in str(link):
-                                prospect['linkedin_url'] = link
+                                linkedin_url = link
                                 break
-                        prospect['confidence'] = calculate_extraction_confidence(prospect)
-                        prospects.append(prospect)
+                        prospects.append(_new_prospect(name, person.get('jobTitle'), company,
+                                                       person.get('email'), linkedin_url, source_url))
         except (ValueError, KeyError, TypeError):
             continue
     return prospects
 
-def extract_prospects_from_content(content: str, source_url: str, html_content: str = None) -> List[Dict]:
+def extract_prospects_from_content(content: str, source_url: str, html_content: str = None) -> List[RawProspect]:
     """
     Extract prospect information using multiple strategies.
     Tries regex on markdown first, falls back to HTML card parsing,
@@ -777,7 +1286,7 @@ def extract_prospects_from_content(content: str, source_url: str, html_content:
 
     return prospects
 
-def _extract_regex(content: str, source_url: str) -> List[Dict]:
+def _extract_regex(content: str, source_url: str) -> List[RawProspect]:
     """
     Original regex-based extraction from Firecrawl markdown content.
     Uses tight context windows to avoid mixing LinkedIn/title between contacts.
@@ -789,91 +1298,44 @@ def _extract_regex(content: str, source_url: str) -> List[Dict]:
 
     # Clean markdown artifacts but PRESERVE LinkedIn URLs
     # Convert markdown links to plain text + url: [text](url) -> text url
-    content = re.sub(r'\[([^\]]*)\]\((https?://(?:www\.)?linkedin\.com/[^)]+)\)', r'\1 \2', content)
-    content = re.sub(r'\[([^\]]*)\]\([^)]+\)', r'\1', content)
-    content = re.sub(r'!\[([^\]]*)\]\([^)]+\)', r'\1', content)
-    content = re.sub(r'\*\*([^*]+)\*\*', r'\1', content)
-    content = re.sub(r'\*([^*]+)\*', r'\1', content)
-    content = re.sub(r'__([^_]+)__', r'\1', content)
-    content = re.sub(r'_([^_]+)_', r'\1', content)
-
-    title_keywords = [
-        'CEO', 'CTO', 'CFO', 'COO', 'CMO', 'VP', 'Director', 'Manager',
-        'Head of', 'Lead', 'Engineer', 'Developer', 'Designer', 'Founder',
-        'President', 'Chief', 'Officer', 'Executive', 'Consultant',
-        'Architect', 'Principal', 'Senior', 'Junior', 'Associate', 'Co-founder',
-        'Controller', 'Partner', 'Analyst', 'Coordinator', 'Specialist',
-        'Recruiter', 'Advisor', 'Strategist'
-    ]
-
-    company_keywords = ['Inc', 'Corp', 'LLC', 'Ltd', 'Company', 'Co.', 'Technologies', 'Solutions', 'Services']
-
-    # Skip common false positives
-    skip_names = {
-        'LinkedIn', 'Apple', 'Google', 'Facebook', 'Adobe', 'MongoDB', 'Kong',
-        'FoundationDB', 'Visual', 'Sciences', 'Fire', 'Darkness', 'Ring', 'Test', 'Contact',
-        'Backstory', 'Leadership', 'Careers', 'Brand', 'Fintech', 'Blockchain', 'Databases',
-        'Cloud', 'Distributed', 'Reliability', 'Glossary', 'Cost', 'Outages', 'Deterministic',
-        'Simulation', 'Property', 'Based', 'Autonomous', 'Testing', 'Techniques', 'Catalog',
-        'Blockchains', 'Acid', 'Compliance', 'Services', 'Experience', 'Problems', 'Security',
-        'Manifesto', 'Stories', 'Working', 'Antithesis', 'Primer', 'Read More', 'Learn More',
-        'About Us', 'Our Team', 'Join Us', 'See All', 'View All', 'Show More',
-        'Chief Executive', 'Chief Technology', 'Chief Financial', 'Chief Operating',
-        'Chief Marketing', 'Chief Revenue', 'Chief Product', 'Chief Information',
-        'Vice President', 'General Manager', 'Managing Director', 'Privacy Policy',
-        'Terms Of', 'All Rights', 'Follow Us', 'Get Started', 'Sign Up', 'Log In'
-    }
-
-    # Title-only patterns to reject
-    title_only_patterns = [
-        r'^(?:Chief\s+\w+\s+Officer)$',
-        r'^(?:Vice\s+President(?:\s+of\s+\w+)?)$',
-        r'^(?:Director\s+of\s+\w+)$',
-        r'^(?:Head\s+of\s+\w+)$',
-        r'^(?:Senior|Junior|Lead|Principal)\s+(?:Engineer|Developer|Designer|Architect|Manager|Consultant)$',
-    ]
-
-    # Name pattern: 2-3 capitalized words separated by single spaces, at start of line.
-    # Uses [^\S\n]* for leading indent (no newline), single space between name words.
-    # Downstream filters (skip_names, title_only_patterns, title_first_words,
-    # and the title-or-company gate) handle false positives.
-    name_pattern = r'(?:^|\n)[^\S\n]*([A-Z][a-z]+ [A-Z][a-z]+(?: [A-Z][a-z]+)?)\b'
-
-    title_first_words = ['Chief', 'Vice', 'Senior', 'Junior', 'Lead', 'Principal',
-                         'Director', 'Manager', 'Head', 'General', 'Managing']
+    # Each pass is skipped when its marker can't occur, and replacements are
+    # callables so re doesn't expand a template per match
+    if '](' in content:
+        if 'linkedin.com/' in content:
+            content = _MD_LINK_LINKEDIN_RE.sub(_group_1_space_2, content)
+        content = _MD_LINK_RE.sub(_group_1, content)
+        if '![' in content:
+            content = _MD_IMAGE_RE.sub(_group_1, content)
+    if '*' in content:
+        content = _MD_BOLD_RE.sub(_group_1, content)
+        content = _MD_ITALIC_RE.sub(_group_1, content)
+    if '_' in content:
+        content = _MD_BOLD_UNDERSCORE_RE.sub(_group_1, content)
+        content = _MD_ITALIC_UNDERSCORE_RE.sub(_group_1, content)
 
     # First, find ALL name matches and pre-filter to identify real person names
-    all_matches = list(re.finditer(name_pattern, content, re.MULTILINE))
-
-    def is_real_person_name(name_str):
-        """Check if a matched string looks like a real person name (not a title or nav text)."""
-        if name_str in skip_names or len(name_str.split()) < 2:
-            return False
-        # Also check if ANY individual word is a known skip word
-        for word in name_str.split():
-            if word in skip_names:
-                return False
-        for tp in title_only_patterns:
-            if re.match(tp, name_str, re.IGNORECASE):
-                return False
-        if name_str.split()[0] in title_first_words:
-            return False
-        return True
+    all_matches = list(_line_matches(_NAME_RE, content))
 
     # Build filtered list of real person name matches and their positions
     person_matches = []
     person_positions = []
-    for match in all_matches:
-        name = match.group(1).strip()
-        if is_real_person_name(name):
-            person_matches.append(match)
-            person_positions.append(match.start())
-
-    raw_prospects = []
+    for start, _, name in all_matches:
+        name = name.strip()
+        if _is_real_person_name(name):
+            person_matches.append((start, name))
+            person_positions.append(start)
+
+    # DEDUPLICATION happens as candidates are found: one slot per title, and a
+    # slot held by a title-like "name" is handed to the first real name that
+    # shares its title. Whether a slot's name looks like a title is worked out
+    # on its first collision and kept. LinkedIn/email/confidence are only
+    # computed for candidates that take a slot.
+    final_prospects = []
+    slot_keys = []  # [name_lower, looks like a title (None = not checked yet)]
+    seen_names_lower = set()
+    seen_titles_lower = {}
 
-    for i, match in enumerate(person_matches):
-        name = match.group(1).strip()
-        pos = match.start()
+    for i, (pos, name) in enumerate(person_matches):
 
         # CONTEXT: from this person's name to the NEXT person's name (or 600 chars max)
         # Only real person names act as boundaries, not title lines like "Chief Executive Officer"
@@ -883,135 +1345,108 @@ def _extract_regex(content: str, source_url: str) -> List[Dict]:
         else:
             context_end = min(len(content), pos + 600)
 
-        # Small lookback for company info that may appear just before the name
+        # Small lookback for company info that may appear just before the name.
+        # The windows are searched in place via pos/endpos rather than sliced out;
+        # pos sits on the line's newline, so \b at the left edge sees the same thing.
         lookback_start = max(0, pos - 100)
-        context = content[lookback_start:context_end]
-        # The name-relative portion (after the name) for title/linkedin/email
-        after_name = content[pos:context_end]
 
         # Find title: look in the lines immediately following the name
         title = None
-        after_lines = after_name.split('\n')
         # Check the first several lines after the name (title may be a few lines down)
-        for line in after_lines[:8]:
+        for line in content[pos:context_end].split('\n', 8)[:8]:
             line_stripped = line.strip()
             if not line_stripped or line_stripped == name:
                 continue
             # Skip lines that are just LinkedIn text or URLs
             if line_stripped.startswith('LinkedIn') or line_stripped.startswith('http'):
                 continue
-            for keyword in title_keywords:
-                if keyword.lower() in line_stripped.lower() and len(line_stripped) < 150:
-                    # Make sure this is a title line, not another person's name
-                    if not re.match(r'^[A-Z][a-z]+ [A-Z][a-z]+$', line_stripped):
-                        title = line_stripped
-                        break
-            if title:
+            # Make sure this is a title line, not another person's name
+            if (len(line_stripped) < 150 and _TITLE_KEYWORD_RE.search(line_stripped)
+                    and not _TWO_WORD_NAME_RE.match(line_stripped)):
+                title = line_stripped
                 break
 
         # Find company: check context around the name
         company = None
-        for keyword in company_keywords:
-            if keyword in context:
-                idx = context.find(keyword)
-                start = max(0, idx - 50)
-                end = min(len(context), idx + 50)
-                phrase = context[start:end]
-                company_match = re.search(rf'([A-Z][a-zA-Z0-9\s&]*?{keyword})', phrase)
+        has_keyword = _COMPANY_KEYWORD_RE.search(content, lookback_start, context_end)
+        for keyword in (_COMPANY_KEYWORDS if has_keyword else ()):
+            idx = content.find(keyword, lookback_start, context_end)
+            if idx >= 0:
+                start = max(lookback_start, idx - 50)
+                end = min(context_end, idx + 50)
+                company_match = _COMPANY_RES[keyword].search(content, start, end)
                 if company_match:
                     company = company_match.group(1).strip()
                     if len(company) < 100:
                         break
 
-        # LinkedIn: only look in the tight window after the name
-        linkedin_url = extract_linkedin_from_text(after_name)
-
-        # Email: only look in the tight window after the name
-        email = None
-        email_pat = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-        emails = re.findall(email_pat, after_name)
-        if emails:
-            personal_emails = [e for e in emails if not any(skip in e.lower() for skip in ['noreply', 'no-reply', 'support', 'info@', 'hello@'])]
-            email = personal_emails[0] if personal_emails else emails[0]
-
-        if (title or company) and name:
-            prospect = {
-                'name': name,
-                'title': title,
-                'company': company,
-                'email': email,
-                'linkedin_url': linkedin_url,
-                'source': source_url
-            }
-            prospect['confidence'] = calculate_extraction_confidence(prospect)
-            raw_prospects.append(prospect)
-
-    # DEDUPLICATION:
-    final_prospects = []
-    seen_names_lower = set()
-    seen_titles_lower = {}
-
-    for p in raw_prospects:
-        name_lower = p['name'].lower().strip()
-        title_lower = (p.get('title') or '').lower().strip()
+        if not (title or company):
+            continue
 
+        name_lower = name.lower().strip()
         if name_lower in seen_names_lower:
             continue
+        title_lower = (title or '').lower().strip()
+
+        existing_idx = seen_titles_lower.get(title_lower) if title_lower else None
+        if existing_idx is not None:
+            slot = slot_keys[existing_idx]
+            if slot[1] is None:
+                slot[1] = bool(_TITLE_KEYWORD_RE.search(final_prospects[existing_idx].name))
+            if not slot[1] or _TITLE_KEYWORD_RE.search(name):
+                continue
 
-        if title_lower and title_lower in seen_titles_lower:
-            existing_idx = seen_titles_lower[title_lower]
-            existing = final_prospects[existing_idx]
-            existing_looks_like_title = any(kw.lower() in existing['name'].lower() for kw in title_keywords)
-            new_looks_like_title = any(kw.lower() in p['name'].lower() for kw in title_keywords)
-            if existing_looks_like_title and not new_looks_like_title:
-                final_prospects[existing_idx] = p
-                seen_names_lower.discard(existing['name'].lower().strip())
-                seen_names_lower.add(name_lower)
+        # LinkedIn and email: only look in the tight window after the name
+        prospect = _new_prospect(name, title, company, find_email(content, pos, context_end),
+                                 extract_linkedin_from_text(content, pos, context_end), source_url)
+
+        if existing_idx is not None:
+            final_prospects[existing_idx] = prospect
+            seen_names_lower.discard(slot[0])
+            seen_names_lower.add(name_lower)
+            slot_keys[existing_idx] = [name_lower, False]
             continue
 
         seen_names_lower.add(name_lower)
         if title_lower:
             seen_titles_lower[title_lower] = len(final_prospects)
-        final_prospects.append(p)
+        slot_keys.append([name_lower, None])
+        final_prospects.append(prospect)
 
     return final_prospects
 
 # ─── Warmth Score Calculation ─────────────────────────────────────────────────
 
-def calculate_warmth_score(prospect: dict) -> int:
-    status_scores = {
-        'lead': 20, 'contacted': 40, 'qualified': 60,
-        'proposal': 80, 'won': 100, 'lost': 5
-    }
-    score = status_scores.get(prospect.get('status', 'lead'), 20)
+# Scores are computed inside the prospects SELECT. Timestamps are stored as
+# naive local time, hence julianday('now', 'localtime').
 
-    # Decay based on last contact
-    last_contact = prospect.get('last_contact_date')
-    if last_contact:
-        try:
-            last_dt = datetime.fromisoformat(last_contact)
-            days_since = (datetime.now() - last_dt).days
-            weeks_since = days_since // 7
-            score -= weeks_since * 5
-        except (ValueError, TypeError):
-            pass
+def _sql_floor(expr: str) -> str:
+    # FLOOR() is only present when SQLite is built with math functions
+    return f'(CAST({expr} AS INTEGER) - (({expr}) < CAST({expr} AS INTEGER)))'
 
-    # Boost from engagement
-    email_opens = prospect.get('email_opens', 0) or 0
-    reply_count = prospect.get('reply_count', 0) or 0
-    score += email_opens * 10
-    score += reply_count * 20
+def _sql_days_since(col: str) -> str:
+    return f"(julianday('now', 'localtime') - julianday({col}))"
 
-    return max(0, min(100, score))
+# Status base score, -5 per full week since last contact, +10 per email open,
+# +20 per reply, clamped to 0-100
+WARMTH_SCORE_SQL = f'''MAX(0, MIN(100,
+    CASE status WHEN 'lead' THEN 20 WHEN 'contacted' THEN 40 WHEN 'qualified' THEN 60
+                WHEN 'proposal' THEN 80 WHEN 'won' THEN 100 WHEN 'lost' THEN 5 ELSE 20 END
+    - 5 * COALESCE({_sql_floor(_sql_days_since('last_contact_date') + ' / 7.0')}, 0)
+    + 10 * COALESCE(email_opens, 0) + 20 * COALESCE(reply_count, 0)))'''
+
+# Qualified/proposal leads untouched for two weeks are flagged stale
+DAYS_IN_STATUS_SQL = f"COALESCE({_sql_floor(_sql_days_since('status_updated_at'))}, 0)"
+IS_STALE_SQL = f"(status IN ('qualified', 'proposal') AND {DAYS_IN_STATUS_SQL} >= 14)"
 
 def log_activity(prospect_id, event_type, description, metadata=None):
     """Log an activity event for a prospect."""
     try:
         conn = get_db()
         c = conn.cursor()
-        import json as _json
         c.execute('INSERT INTO activity_log (prospect_id, event_type, description, metadata, created_at) VALUES (?,?,?,?,?)',
-                  (prospect_id, event_type, description, _json.dumps(metadata) if metadata else None, datetime.now().isoformat()))
+                  (prospect_id, event_type, description, _orjson_dumps(metadata).decode() if metadata else None,
+                   datetime.now().isoformat()))
         conn.commit()
         conn.close()
     except Exception:
@@ -1063,25 +1498,15 @@ def get_prospects():
     c.execute(f'SELECT COUNT(*) as total FROM prospects {where_sql}', params)
     total = c.fetchone()['total']
 
-    c.execute(f'SELECT * FROM prospects {where_sql} ORDER BY created_at DESC LIMIT ? OFFSET ?',
+    # The computed warmth_score comes after the stored column of the same name in
+    # the result, so it wins when each row is zipped into a dict
+    c.row_factory = None
+    c.execute(f'''SELECT *, {WARMTH_SCORE_SQL} AS warmth_score,
+                        {IS_STALE_SQL} AS is_stale, {DAYS_IN_STATUS_SQL} AS days_in_status
+                 FROM prospects {where_sql} ORDER BY created_at DESC LIMIT ? OFFSET ?''',
               params + [per_page, offset])
-    prospects = []
-    for row in c.fetchall():
-        p = dict(row)
-        p['warmth_score'] = calculate_warmth_score(p)
-        # Stale lead detection
-        if p.get('status_updated_at'):
-            try:
-                days_in_status = (datetime.now() - datetime.fromisoformat(p['status_updated_at'])).days
-                p['is_stale'] = days_in_status >= 14 and p.get('status') in ('qualified', 'proposal')
-                p['days_in_status'] = days_in_status
-            except (ValueError, TypeError):
-                p['is_stale'] = False
-                p['days_in_status'] = 0
-        else:
-            p['is_stale'] = False
-            p['days_in_status'] = 0
-        prospects.append(p)
+    keys = [d[0] for d in c.description]
+    prospects = [dict(zip(keys, row)) for row in c.fetchall()]
     conn.close()
     return jsonify({
         'success': True, 'data': prospects,
@@ -1093,22 +1518,48 @@ def get_prospects():
 @login_required
 def add_prospect():
     data = request.json
-    prospect_id = f"p_{datetime.now().timestamp()}"
-    conn = get_db()
-    c = conn.cursor()
-    now_iso = datetime.now().isoformat()
-    c.execute('''INSERT INTO prospects (id, name, company, title, email, phone, status, deal_size, created_at, source, linkedin_url, notes, warmth_score, last_contact_date, email_opens, reply_count, status_updated_at)
-                 VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)''',
-              (prospect_id, data.get('name'), data.get('company'), data.get('title'),
-               data.get('email'), data.get('phone'), data.get('status', 'lead'), data.get('deal_size', 0),
-               now_iso, data.get('source'), data.get('linkedin_url'),
-               data.get('notes'), 20, None, 0, 0, now_iso))
-    conn.commit()
-    conn.close()
+    prospect_id = insert_prospects([data])[0]
     award_xp('prospect_added', data.get('name', ''))
-    log_activity(prospect_id, 'created', f'Prospect "{data.get("name", "")}" added')
     return jsonify({'success': True, 'id': prospect_id})
 
+BULK_PROSPECT_LIMIT = 500
+
+@app.route('/api/prospects/bulk', methods=['POST'])
+@login_required
+def add_prospects_bulk():
+    payload = request.json
+    rows = payload.get('prospects') if isinstance(payload, dict) else None
+    if not rows:
+        return jsonify({'success': False, 'error': 'No prospects provided'}), 400
+    if not isinstance(rows, list) or not all(isinstance(d, dict) for d in rows):
+        return jsonify({'success': False, 'error': 'prospects must be a list of objects'}), 400
+    if len(rows) > BULK_PROSPECT_LIMIT:
+        return jsonify({'success': False, 'error': f'At most {BULK_PROSPECT_LIMIT} prospects per request'}), 400
+    ids = insert_prospects(rows)
+    for data in rows:
+        award_xp('prospect_added', data.get('name', ''))
+    return jsonify({'success': True, 'ids': ids, 'inserted': len(ids)})
+
+def insert_prospects(rows):
+    """Insert prospects plus their 'created' activity entries in one transaction.
+    Returns the new prospect ids in input order."""
+    now = datetime.now()
+    now_iso = now.isoformat()
+    ids = [f"p_{now.timestamp()}_{i}" for i in range(len(rows))]
+    conn = get_db()
+    with conn:
+        conn.executemany('''INSERT INTO prospects (id, name, company, title, email, phone, status, deal_size, created_at, source, linkedin_url, notes, warmth_score, last_contact_date, email_opens, reply_count, status_updated_at)
+                              VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)''',
+                         [(pid, d.get('name'), d.get('company'), d.get('title'),
+                           d.get('email'), d.get('phone'), d.get('status', 'lead'), d.get('deal_size', 0),
+                           now_iso, d.get('source'), d.get('linkedin_url'),
+                           d.get('notes'), 20, None, 0, 0, now_iso) for pid, d in zip(ids, rows)])
+        conn.executemany('INSERT INTO activity_log (prospect_id, event_type, description, metadata, created_at) VALUES (?,?,?,?,?)',
+                         [(pid, 'created', f'Prospect "{d.get("name", "")}" added', None, now_iso)
+                          for pid, d in zip(ids, rows)])
+    conn.close()
+    return ids
+
 @app.route('/api/prospects/<prospect_id>', methods=['PUT'])
 @login_required
 def update_prospect(prospect_id):
@@ -1176,20 +1627,18 @@ def delete_prospect(prospect_id):
 @app.route('/api/stats', methods=['GET'])
 @login_required
 def get_stats():
-    conn = get_db()
-    c = conn.cursor()
-    c.execute('SELECT COUNT(*) as total FROM prospects')
-    total = c.fetchone()['total']
-    c.execute('SELECT COUNT(*) as count FROM prospects WHERE status = ?', ('lead',))
-    leads = c.fetchone()['count']
-    c.execute('SELECT SUM(deal_size) as value FROM prospects')
-    value = c.fetchone()['value'] or 0
-    c.execute('SELECT COUNT(*) as count FROM prospects WHERE status = ?', ('won',))
-    won = c.fetchone()['count']
-    c.execute('SELECT COUNT(*) as count FROM tasks WHERE status = ? AND due_date <= ?',
-              ('pending', datetime.now().isoformat()))
-    overdue_tasks = c.fetchone()['count']
-    conn.close()
+    with db_pool.acquire() as conn:
+        # One pass over idx_prospects_status_deal instead of a scan per figure,
+        # with the overdue count read from idx_tasks_status_due in the same statement
+        row = conn.execute('''SELECT COUNT(*) as total,
+                                     COALESCE(SUM(status = 'lead'), 0) as leads,
+                                     SUM(deal_size) as value,
+                                     COALESCE(SUM(status = 'won'), 0) as won,
+                                     (SELECT COUNT(*) FROM tasks WHERE status = ? AND due_date <= ?) as overdue
+                              FROM prospects''', ('pending', datetime.now().isoformat())).fetchone()
+        total, leads, won = row['total'], row['leads'], row['won']
+        value = row['value'] or 0
+        overdue_tasks = row['overdue']
     return jsonify({'success': True, 'data': {
         'total': total, 'leads': leads, 'pipeline_value': value,
         'won': won, 'overdue_tasks': overdue_tasks
@@ -1197,6 +1646,91 @@ def get_stats():
 
 # ─── Search / Scrape / Crawl ─────────────────────────────────────────────────
 
+def dedupe_prospects(prospects: List[RawProspect]) -> List[RawProspect]:
+    """Final deduplication across all pages, by email or name + company."""
+    unique_prospects = []
+    seen = set()
+    for prospect in prospects:
+        # A (name, company) tuple hashes without building a string and can't
+        # collide the way "a_b" + "c" and "a" + "b_c" did
+        identifier = prospect.email or (prospect.name, prospect.company)
+        if identifier not in seen:
+            seen.add(identifier)
+            unique_prospects.append(prospect)
+    return unique_prospects
+
+# Background crawl jobs, newest last. Kept in memory so a client without a
+# socket can poll GET /api/search/jobs/<job_id>; only the last few are retained.
+CRAWL_JOBS_MAX = 200
+_crawl_jobs = {}
+_JOB_ID_RE = re.compile(r'[\w-]{8,64}')
+
+def start_crawl_job(job_id, user_id, url, limit):
+    _crawl_jobs[job_id] = {'user_id': user_id, 'status': 'running', 'url': url, 'pages': []}
+    while len(_crawl_jobs) > CRAWL_JOBS_MAX:
+        _crawl_jobs.pop(next(iter(_crawl_jobs)))
+    socketio.start_background_task(_run_crawl, job_id, f'user_{user_id}', url, limit)
+
+def _extract_page(page, default_url):
+    content = page.get('markdown', '')
+    html_content = page.get('html', '')
+    return extract_prospects_from_content(content or html_content, page.get('url', default_url),
+                                          html_content=html_content)
+
+def extract_pages(pages, default_url):
+    """Prospects for each crawled page, in page order."""
+    # Extraction is pure CPU. Under eventlet it would stall every socket on the
+    # worker until it finished, so hand each page to eventlet's OS-thread pool.
+    if SOCKETIO_ASYNC_MODE == 'eventlet':
+        from eventlet import tpool
+        return [tpool.execute(_extract_page, page, default_url) for page in pages]
+    return [_extract_page(page, default_url) for page in pages]
+
+def _run_crawl(job_id, room, url, limit):
+    job = _crawl_jobs.get(job_id, {})
+    prospects = []
+    pages_crawled = job.setdefault('pages', [])
+
+    def on_pages(pages):
+        for page, page_prospects in zip(pages, extract_pages(pages, url)):
+            page_url = page.get('url', url)
+            prospects.extend(page_prospects)
+            pages_crawled.append({'url': page_url, 'prospect_count': len(page_prospects)})
+            socketio.emit('crawl_progress', {
+                'job_id': job_id, 'page': page_url, 'prospects': page_prospects,
+                'pages_done': len(pages_crawled)
+            }, namespace='/crawl', to=room)
+
+    try:
+        result = firecrawl.crawl_website(url, limit=limit, on_pages=on_pages, use_cache=True)
+    except Exception as e:
+        print(f"Crawl job {job_id} error: {str(e)}")
+        result = None
+    if not result or 'data' not in result:
+        job.update(status='failed', error='Failed to crawl website.')
+        socketio.emit('crawl_failed', {'job_id': job_id, 'error': job['error']}, namespace='/crawl', to=room)
+        return
+
+    unique_prospects = dedupe_prospects(prospects)
+    job.update(status='completed', result={
+        'success': True, 'job_id': job_id, 'prospects': unique_prospects,
+        'pages': pages_crawled,
+        'message': f'Found {len(unique_prospects)} unique prospects from {len(pages_crawled)} pages',
+        'total_scraped': len(prospects)
+    })
+    socketio.emit('crawl_done', job['result'], namespace='/crawl', to=room)
+
+@app.route('/api/search/jobs/<job_id>', methods=['GET'])
+@login_required
+def get_crawl_job(job_id):
+    job = _crawl_jobs.get(job_id)
+    if not job or job['user_id'] != session.get('user_id'):
+        return jsonify({'success': False, 'error': 'Job not found'}), 404
+    if job['status'] == 'completed':
+        return jsonify({'status': 'completed', **job['result']})
+    return jsonify({'success': job['status'] != 'failed', 'job_id': job_id, 'status': job['status'],
+                    'error': job.get('error'), 'pages': job['pages']})
+
 @app.route('/api/search', methods=['POST'])
 @limiter.limit("10 per minute")
 @login_required
@@ -1210,12 +1744,11 @@ def search_prospects():
         if not url and not query:
             return jsonify({'success': False, 'error': 'Query or URL required'}), 400
 
-        firecrawl = FirecrawlClient(FIRECRAWL_API_KEY)
         prospects = []
         pages_crawled = []
 
         if search_type == 'scrape' and url:
-            result = firecrawl.scrape_url(url)
+            result = firecrawl.scrape_url(url, use_cache=True)
             if result and 'data' in result:
                 content = result['data'].get('markdown', '')
                 html_content = result['data'].get('html', '')
@@ -1227,21 +1760,16 @@ def search_prospects():
                 })
 
         elif search_type == 'crawl' and url:
-            limit = data.get('limit', 10)
-            result = firecrawl.crawl_website(url, limit=limit)
-            if result and 'data' in result:
-                for page in result['data']:
-                    content = page.get('markdown', '')
-                    html_content = page.get('html', '')
-                    page_url = page.get('url', url)
-                    page_prospects = extract_prospects_from_content(content or html_content, page_url, html_content=html_content)
-                    prospects.extend(page_prospects)
-                    pages_crawled.append({
-                        'url': page_url,
-                        'prospect_count': len(page_prospects)
-                    })
-            else:
-                return jsonify({'success': False, 'error': 'Failed to crawl website.'}), 400
+            # Crawls take up to a minute; run them off the request and stream
+            # pages to the user's /crawl socket room as they finish
+            # The client's id lets it match progress events that beat this
+            # response; anything malformed or already taken gets a fresh one
+            job_id = data.get('job_id')
+            if not isinstance(job_id, str) or not _JOB_ID_RE.fullmatch(job_id) or job_id in _crawl_jobs:
+                job_id = uuid.uuid4().hex
+            start_crawl_job(job_id, session['user_id'], url, data.get('limit', 10))
+            award_xp('scrape_ran', url)
+            return jsonify({'success': True, 'type': 'crawl', 'job_id': job_id}), 202
 
         elif search_type == 'map' and url:
             result = firecrawl.map_website(url)
@@ -1252,16 +1780,7 @@ def search_prospects():
                     'message': f'Found {len(result["data"].get("links", []))} URLs'
                 })
 
-        # Final deduplication across all pages
-        unique_prospects = []
-        seen = set()
-        for prospect in prospects:
-            identifier = prospect.get('email')
-            if not identifier:
-                identifier = f"{prospect.get('name', '')}_{prospect.get('company', '')}"
-            if identifier and identifier not in seen:
-                seen.add(identifier)
-                unique_prospects.append(prospect)
+        unique_prospects = dedupe_prospects(prospects)
 
         award_xp('scrape_ran', url)
 
@@ -1285,8 +1804,7 @@ def scrape_url():
         url = data.get('url')
         if not url:
             return jsonify({'success': False, 'error': 'URL required'}), 400
-        firecrawl = FirecrawlClient(FIRECRAWL_API_KEY)
-        result = firecrawl.scrape_url(url)
+        result = firecrawl.scrape_url(url, use_cache=True)
         if not result or 'data' not in result:
             return jsonify({'success': False, 'error': 'Failed to scrape URL'}), 500
         content = result['data'].get('markdown', '')
@@ -1309,30 +1827,20 @@ def crawl_website():
         limit = data.get('limit', 10)
         if not url:
             return jsonify({'success': False, 'error': 'URL required'}), 400
-        firecrawl = FirecrawlClient(FIRECRAWL_API_KEY)
-        result = firecrawl.crawl_website(url, limit=limit)
+        result = firecrawl.crawl_website(url, limit=limit, use_cache=True)
         if not result:
             return jsonify({'success': False, 'error': 'Failed to crawl website.'}), 500
         all_prospects = []
         pages = []
         if 'data' in result:
-            for page in result['data']:
-                content = page.get('markdown', '')
-                html_content = page.get('html', '')
-                page_url = page.get('url', url)
-                page_prospects = extract_prospects_from_content(content or html_content, page_url, html_content=html_content)
+            for page, page_prospects in zip(result['data'], extract_pages(result['data'], url)):
+                content = page.get('markdown', '') or page.get('html', '')
                 all_prospects.extend(page_prospects)
                 pages.append({
-                    'url': page_url, 'prospect_count': len(page_prospects),
-                    'content_length': len(content or html_content or '')
+                    'url': page.get('url', url), 'prospect_count': len(page_prospects),
+                    'content_length': len(content or '')
                 })
-        unique_prospects = []
-        seen = set()
-        for prospect in all_prospects:
-            identifier = prospect.get('email') or f"{prospect.get('name')}_{prospect.get('company')}"
-            if identifier not in seen:
-                seen.add(identifier)
-                unique_prospects.append(prospect)
+        unique_prospects = dedupe_prospects(all_prospects)
         return jsonify({
             'success': True, 'prospects': unique_prospects,
             'pages_crawled': len(pages), 'page_details': pages,
@@ -1344,6 +1852,14 @@ def crawl_website():
 
 # ─── CSV Import/Export ────────────────────────────────────────────────────────
 
+CSV_IMPORT_CHUNK = 10000
+# Rows whose email is already on file (case-insensitively, including earlier rows
+# of the same upload) are dropped by SQLite itself via idx_prospects_email_lc
+SQL_IMPORT_PROSPECT = ('INSERT INTO prospects (id, name, company, title, email, status, deal_size, created_at, '
+                       'source, linkedin_url, notes, warmth_score) '
+                       'SELECT ?1, ?2, ?3, ?4, ?5, ?6, ?7, ?8, ?9, ?10, ?11, ?12 '
+                       "WHERE ?5 = '' OR NOT EXISTS (SELECT 1 FROM prospects WHERE LOWER(email) = LOWER(?5))")
+
 @app.route('/api/import-csv', methods=['POST'])
 @login_required
 def import_csv():
@@ -1354,39 +1870,49 @@ def import_csv():
         if not file.filename.endswith('.csv'):
             return jsonify({'success': False, 'error': 'File must be CSV'}), 400
 
-        stream = io.StringIO(file.stream.read().decode('utf-8'))
-        reader = csv.DictReader(stream)
+        # Decode the upload line by line instead of holding the whole file as text.
+        # iterdecode splits on b'\n' in the raw bytes, which is what csv expects
+        # (a StreamReader would also split on U+2028, \x0c etc. inside a field)
+        reader = csv.DictReader(codecs.iterdecode(file.stream, 'utf-8'))
 
-        conn = get_db()
-        c = conn.cursor()
-        imported = 0
+        now = datetime.now()
+        now_iso = now.isoformat()
+        id_prefix = f"p_{now.timestamp()}_"
+        parsed = 0
         errors = 0
+        rows = []
 
-        for row in reader:
-            try:
-                prospect_id = f"p_{datetime.now().timestamp()}_{imported}"
-                c.execute('''INSERT INTO prospects (id, name, company, title, email, status, deal_size, created_at, source, linkedin_url, notes, warmth_score)
-                             VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)''',
-                          (prospect_id,
-                           row.get('name', row.get('Name', '')),
-                           row.get('company', row.get('Company', '')),
-                           row.get('title', row.get('Title', '')),
-                           row.get('email', row.get('Email', '')),
-                           row.get('status', row.get('Status', 'lead')),
-                           float(row.get('deal_size', row.get('Deal Size', 0)) or 0),
-                           datetime.now().isoformat(),
-                           row.get('source', row.get('Source', '')),
-                           row.get('linkedin_url', row.get('LinkedIn', '')),
-                           row.get('notes', row.get('Notes', '')),
-                           20))
-                imported += 1
-            except Exception as e:
-                errors += 1
-                print(f"CSV row error: {e}")
-
-        conn.commit()
+        conn = get_db()
+        changes_before = conn.total_changes
+        # One transaction for the whole file, written CSV_IMPORT_CHUNK rows per executemany
+        with conn:
+            for row in reader:
+                try:
+                    rows.append((f"{id_prefix}{parsed}",
+                                 row.get('name', row.get('Name', '')),
+                                 row.get('company', row.get('Company', '')),
+                                 row.get('title', row.get('Title', '')),
+                                 row.get('email', row.get('Email', '')),
+                                 row.get('status', row.get('Status', 'lead')),
+                                 float(row.get('deal_size', row.get('Deal Size', 0)) or 0),
+                                 now_iso,
+                                 row.get('source', row.get('Source', '')),
+                                 row.get('linkedin_url', row.get('LinkedIn', '')),
+                                 row.get('notes', row.get('Notes', '')),
+                                 20))
+                except (ValueError, TypeError) as e:
+                    errors += 1
+                    print(f"CSV row error: {e}")
+                    continue
+                parsed += 1
+                if len(rows) >= CSV_IMPORT_CHUNK:
+                    conn.executemany(SQL_IMPORT_PROSPECT, rows)
+                    rows.clear()
+            if rows:
+                conn.executemany(SQL_IMPORT_PROSPECT, rows)
+        imported = conn.total_changes - changes_before
         conn.close()
-        return jsonify({'success': True, 'imported': imported, 'errors': errors})
+        return jsonify({'success': True, 'imported': imported, 'duplicates': parsed - imported, 'errors': errors})
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
@@ -1396,18 +1922,28 @@ def export_csv():
     conn = get_db()
     c = conn.cursor()
     c.execute('SELECT * FROM prospects')
-    prospects = [dict(row) for row in c.fetchall()]
-    conn.close()
 
-    output = io.StringIO()
-    if prospects:
-        writer = csv.DictWriter(output, fieldnames=prospects[0].keys())
-        writer.writeheader()
-        writer.writerows(prospects)
+    # Streamed in fetchmany batches like stream_json_rows; the connection is
+    # released once the generator finishes
+    def generate(batch_size=500):
+        try:
+            rows = c.fetchmany(batch_size)
+            if not rows:
+                return
+            buf = io.StringIO()
+            writer = csv.writer(buf)
+            writer.writerow([d[0] for d in c.description])
+            while rows:
+                writer.writerows(rows)
+                yield buf.getvalue()
+                buf.seek(0)
+                buf.truncate()
+                rows = c.fetchmany(batch_size)
+        finally:
+            conn.close()
 
-    from flask import Response
     return Response(
-        output.getvalue(),
+        stream_with_context(generate()),
         mimetype='text/csv',
         headers={'Content-Disposition': 'attachment; filename=prospects_export.csv'}
     )
@@ -1443,11 +1979,22 @@ def add_task():
                data.get('priority', 'medium'), data.get('category', 'general')))
     conn.commit()
     conn.close()
+    # The activity entry is its own write; don't hold the response for it
     award_xp('task_added', data.get('title', ''))
     if data.get('prospect_id'):
-        log_activity(data['prospect_id'], 'task_created', f'Task created: {data.get("title", "")}')
+        socketio.start_background_task(log_activity, data['prospect_id'], 'task_created',
+                                       f'Task created: {data.get("title", "")}')
     return jsonify({'success': True, 'id': task_id})
 
+# One fixed UPDATE for every edit: each column takes its (present, value) pair
+# and keeps its current value when the field wasn't sent
+TASK_UPDATE_FIELDS = ('title', 'description', 'due_date', 'status', 'priority', 'category')
+SQL_UPDATE_TASK = ('UPDATE tasks SET '
+                   + ', '.join(f'{field} = CASE WHEN ? THEN ? ELSE {field} END' for field in TASK_UPDATE_FIELDS)
+                   + ' WHERE id = ?')
+SQL_COMPLETE_TASK = ("UPDATE tasks SET status = 'completed' WHERE id = ? AND status IS NOT 'completed' "
+                     'RETURNING prospect_id, title')
+
 @app.route('/api/tasks/<task_id>', methods=['PUT'])
 @login_required
 def update_task(task_id):
@@ -1455,26 +2002,28 @@ def update_task(task_id):
     conn = get_db()
     c = conn.cursor()
 
-    # Check if completing a task for XP
-    c.execute('SELECT * FROM tasks WHERE id = ?', (task_id,))
-    old_task = c.fetchone()
-    if data.get('status') == 'completed' and old_task and old_task['status'] != 'completed':
-        award_xp('task_completed', task_id)
-        if old_task['prospect_id']:
-            log_activity(old_task['prospect_id'], 'task_completed', f'Task completed: {old_task["title"]}')
-
-    update_fields = []
-    values = []
-    for field in ['title', 'description', 'due_date', 'status', 'priority', 'category']:
-        if field in data:
-            update_fields.append(f"{field} = ?")
-            values.append(data[field])
-    if update_fields:
+    # Completing a task earns XP; the conditional UPDATE only returns a row
+    # when this request is the one that flips it to completed
+    completed = None
+    if data.get('status') == 'completed':
+        c.execute(SQL_COMPLETE_TASK, (task_id,))
+        completed = c.fetchone()
+
+    if any(field in data for field in TASK_UPDATE_FIELDS):
+        values = []
+        for field in TASK_UPDATE_FIELDS:
+            values += (field in data, data.get(field))
         values.append(task_id)
-        query = f"UPDATE tasks SET {', '.join(update_fields)} WHERE id = ?"
-        c.execute(query, values)
-        conn.commit()
+        c.execute(SQL_UPDATE_TASK, values)
+    conn.commit()
     conn.close()
+
+    # After the commit: XP is queued, the activity entry opens its own connection
+    if completed:
+        award_xp('task_completed', task_id)
+        if completed['prospect_id']:
+            socketio.start_background_task(log_activity, completed['prospect_id'], 'task_completed',
+                                           f'Task completed: {completed["title"]}')
     return jsonify({'success': True})
 
 @app.route('/api/tasks/<task_id>', methods=['DELETE'])
@@ -1489,7 +2038,10 @@ def delete_task(task_id):
 
 # ─── AI Icebreaker ────────────────────────────────────────────────────────────
 
+_SENTENCE_SPLIT_RE = re.compile(r'[.!?]\s')
+
 @app.route('/api/icebreaker', methods=['POST'])
+@limiter.limit("20 per minute")
 @login_required
 def generate_icebreaker():
     try:
@@ -1502,12 +2054,11 @@ def generate_icebreaker():
         # Try to scrape the source URL for recent content
         content_snippet = ''
         if source_url:
-            firecrawl = FirecrawlClient(FIRECRAWL_API_KEY)
             result = firecrawl.scrape_url(source_url, formats=['markdown'])
             if result and 'data' in result:
                 raw_content = result['data'].get('markdown', '')
                 # Extract interesting snippets - look for news, blog, recent mentions
-                sentences = re.split(r'[.!?]\s', raw_content[:3000])
+                sentences = _SENTENCE_SPLIT_RE.split(raw_content[:3000])
                 interesting = []
                 interest_keywords = ['launched', 'announced', 'raised', 'expanded', 'hired',
                                      'partnership', 'award', 'recognition', 'growth', 'innovation',
@@ -1562,9 +2113,14 @@ def generate_icebreaker():
 
 # ─── Chat Messages (REST fallback) ───────────────────────────────────────────
 
+# Every /chat socket joins this room on connect so broadcasts go through a
+# single room emit instead of a per-connection broadcast.
+CHAT_ROOM = 'global'
+
 @app.route('/api/chat/messages', methods=['GET'])
 def get_chat_messages():
     limit = request.args.get('limit', 50, type=int)
+    flush_chat_messages()
     conn = get_db()
     c = conn.cursor()
     c.execute('SELECT * FROM chat_messages ORDER BY timestamp DESC LIMIT ?', (limit,))
@@ -1576,25 +2132,22 @@ def get_chat_messages():
 @app.route('/api/chat/messages', methods=['POST'])
 def post_chat_message():
     data = request.json
-    conn = get_db()
-    c = conn.cursor()
-    timestamp = datetime.now().isoformat()
-    c.execute('INSERT INTO chat_messages (username, message, timestamp) VALUES (?, ?, ?)',
-              (data.get('username', 'Anonymous'), data.get('message', ''), timestamp))
-    conn.commit()
-    msg_id = c.lastrowid
-    conn.close()
-
     msg = {
-        'id': msg_id,
+        'id': next(_chat_ids),
         'username': data.get('username', 'Anonymous'),
         'message': data.get('message', ''),
-        'timestamp': timestamp
+        'timestamp': fast_now()
     }
-    # Broadcast via SocketIO
-    socketio.emit('new_message', msg, namespace='/chat')
+    # Broadcast via SocketIO, then hand the row to the batched chat writer
+    queue_chat_broadcast(msg)
+    _chat_write_queue.append((msg['id'], msg['username'], msg['message'], msg['timestamp']))
     return jsonify({'success': True, 'data': msg})
 
+@app.route('/api/chat/online', methods=['GET'])
+def get_chat_online():
+    users = chat_roster()
+    return jsonify({'success': True, 'data': users, 'count': len(users)})
+
 # ─── Auth Endpoints ──────────────────────────────────────────────────────────
 
 @app.route('/api/auth/register', methods=['POST'])
@@ -1614,7 +2167,7 @@ def register():
         return jsonify({'success': False, 'error': 'Password must be at least 6 characters'}), 400
     if len(username) < 3 or len(username) > 30:
         return jsonify({'success': False, 'error': 'Username must be 3-30 characters'}), 400
-    if avatar not in AVATAR_OPTIONS:
+    if avatar not in _AVATAR_SET:
         avatar = 'avatar-default'
     if len(signature) > 200:
         signature = signature[:200]
@@ -1630,6 +2183,7 @@ def register():
         user_id = c.lastrowid
         session['user_id'] = user_id
         session['username'] = username
+        remember_role('user')
         conn.close()
         return jsonify({'success': True, 'user': {
             'id': user_id, 'username': username, 'email': email,
@@ -1657,6 +2211,7 @@ def login():
         conn.close()
         session['user_id'] = user['id']
         session['username'] = user['username']
+        remember_role(user['role'])
         # Rotate challenges on login (picks new set if day changed)
         rotate_challenges()
         return jsonify({'success': True, 'user': {
@@ -1686,15 +2241,18 @@ def update_profile():
     signature = data.get('signature', None)
     display_name = data.get('display_name', None)
 
+    # NULL leaves a column as it is
+    avatar = avatar if avatar and avatar in _AVATAR_SET else None
+    signature = signature[:200] if signature is not None else None
+    display_name = display_name.strip()[:50] if display_name else None
+
     conn = get_db()
     c = conn.cursor()
-    if avatar and avatar in AVATAR_OPTIONS:
-        c.execute('UPDATE users SET avatar = ? WHERE id = ?', (avatar, session['user_id']))
-    if signature is not None:
-        c.execute('UPDATE users SET signature = ? WHERE id = ?', (signature[:200], session['user_id']))
-    if display_name:
-        c.execute('UPDATE users SET display_name = ? WHERE id = ?', (display_name.strip()[:50], session['user_id']))
-    conn.commit()
+    if avatar is not None or signature is not None or display_name is not None:
+        c.execute('UPDATE users SET avatar = COALESCE(?, avatar), signature = COALESCE(?, signature), '
+                  'display_name = COALESCE(?, display_name) WHERE id = ?',
+                  (avatar, signature, display_name, session['user_id']))
+        conn.commit()
     conn.close()
     user = get_current_user()
     return jsonify({'success': True, 'user': user})
@@ -1716,8 +2274,7 @@ def get_profile_stats():
     uid = user['id']
 
     # XP & level info (user-scoped)
-    c.execute('SELECT COALESCE(SUM(xp_earned), 0) as total FROM xp_log WHERE user_id = ? OR user_id IS NULL', (uid,))
-    total_xp = c.fetchone()['total']
+    total_xp = xp_total(uid)
     level_info = get_level_info(total_xp)
 
     # Streak info
@@ -1794,16 +2351,23 @@ def get_forum_posts():
 
     conn = get_db()
     c = conn.cursor()
-    c.execute('''SELECT fp.*, u.username, u.display_name, u.avatar,
-                 (SELECT COUNT(*) FROM forum_comments WHERE post_id = fp.id) as comment_count
-                 FROM forum_posts fp
-                 JOIN users u ON fp.user_id = u.id
-                 ORDER BY fp.created_at DESC
-                 LIMIT ? OFFSET ?''', (per_page, offset))
+    # The total rides along on every row via a window count; comment counts are
+    # only taken for the page itself
+    c.execute('''SELECT p.*, (SELECT COUNT(*) FROM forum_comments WHERE post_id = p.id) as comment_count
+                 FROM (SELECT fp.*, u.username, u.display_name, u.avatar, COUNT(*) OVER () as total
+                       FROM forum_posts fp
+                       JOIN users u ON fp.user_id = u.id
+                       ORDER BY fp.created_at DESC
+                       LIMIT ? OFFSET ?) p
+                 ORDER BY p.created_at DESC''', (per_page, offset))
     posts = [dict(row) for row in c.fetchall()]
-
-    c.execute('SELECT COUNT(*) as total FROM forum_posts')
-    total = c.fetchone()['total']
+    total = posts[0]['total'] if posts else 0
+    for post in posts:
+        del post['total']
+    if not posts and offset > 0:
+        # Past the last page there's no row to carry the total
+        c.execute('SELECT COUNT(*) as total FROM forum_posts fp JOIN users u ON fp.user_id = u.id')
+        total = c.fetchone()['total']
     conn.close()
     return jsonify({'success': True, 'data': posts, 'total': total, 'page': page})
 
@@ -1874,14 +2438,22 @@ def create_forum_comment(post_id):
 
 # ─── News API ────────────────────────────────────────────────────────────────
 
+# Headlines per gnews category, reused for NEWS_CACHE_TTL seconds
+NEWS_CACHE_TTL = 600
+_news_cache = {}
+
 @app.route('/api/news', methods=['GET'])
 def get_news():
     category = request.args.get('category', 'business')
     try:
         gnews_category = 'business' if category == 'financial' else 'general'
+        now = _time.time()
+        cached = _news_cache.get(gnews_category)
+        if cached and now - cached['timestamp'] < NEWS_CACHE_TTL:
+            return jsonify({'success': True, 'articles': cached['articles']})
         gnews_key = os.environ.get('GNEWS_API_KEY', 'demo')
         url = f'https://gnews.io/api/v4/top-headlines?category={gnews_category}&lang=en&max=8&apikey={gnews_key}'
-        response = requests.get(url, timeout=10)
+        response = http_session.get(url, timeout=10)
         data = response.json()
         articles = []
         if 'articles' in data:
@@ -1893,6 +2465,7 @@ def get_news():
                     'time': article.get('publishedAt', ''),
                     'description': article.get('description', '')
                 })
+            _news_cache[gnews_category] = {'articles': articles, 'timestamp': now}
         return jsonify({'success': True, 'articles': articles})
     except Exception as e:
         return jsonify({'success': False, 'error': str(e), 'articles': []})
@@ -1933,7 +2506,7 @@ def get_stocks():
     try:
         for sym in batch_symbols:
             url = f'https://www.alphavantage.co/query?function=GLOBAL_QUOTE&symbol={sym}&apikey={ALPHA_VANTAGE_KEY}'
-            resp = requests.get(url, timeout=8)
+            resp = http_session.get(url, timeout=8)
             data = resp.json()
             quote = data.get('Global Quote', {})
             if quote:
@@ -2003,10 +2576,14 @@ SIGNAL_KEYWORDS = {
     'leadership': ['new hire', 'appointed', 'appoints', 'ceo', 'cto', 'cfo', 'vp', 'joined', 'joins', 'leadership', 'executive', 'hire', 'hires'],
     'expansion': ['expansion', 'expands', 'new office', 'hiring', 'growth', 'scale', 'launch', 'launches', 'opens', 'ipo', 'unicorn'],
 }
-
-def classify_signal(text):
-    """Classify a headline/summary into a signal type based on keyword matching."""
-    text_lower = text.lower()
+# Every trigger keyword once, in SIGNAL_KEYWORDS order ('$' counts for scoring but isn't shown)
+_TRIGGER_KEYWORDS = tuple(dict.fromkeys(kw for keywords in SIGNAL_KEYWORDS.values() for kw in keywords if kw != '$'))
+# One match per stripped markdown line: a '## [Headline](URL)' line, or a
+# summary candidate (over 30 chars, not a heading/link/image/list item)
+_SAUCE_LINE_RE = re.compile(r'##\s*\[(?P<title>.+?)\]\((?P<url>.+?)\)|(?P<text>[^#\[!\-].{30,})')
+
+def classify_signal(text_lower):
+    """Classify a lowercased headline/summary into a signal type based on keyword matching."""
     scores = {}
     for signal_type, keywords in SIGNAL_KEYWORDS.items():
         score = sum(1 for kw in keywords if kw in text_lower)
@@ -2016,32 +2593,49 @@ def classify_signal(text):
         return max(scores, key=scores.get)
     return 'funding'  # Default for VC news
 
-def extract_trigger_words(text):
-    """Find which trigger keywords appear in the text."""
+def extract_trigger_words(text_lower):
+    """Find which trigger keywords appear in the lowercased text."""
+    # Limit to 4 keywords
+    return list(itertools.islice((kw for kw in _TRIGGER_KEYWORDS if kw in text_lower), 4))
+
+def analyze_signal(text):
+    """(signal_type, trigger_words) for a headline/summary, lowercasing it once for both."""
     text_lower = text.lower()
-    found = []
-    all_keywords = []
-    for keywords in SIGNAL_KEYWORDS.values():
-        all_keywords.extend(keywords)
-    for kw in all_keywords:
-        if kw in text_lower and kw not in found and kw != '$':
-            found.append(kw)
-    return found[:4]  # Limit to 4 keywords
+    return classify_signal(text_lower), extract_trigger_words(text_lower)
+
+def _sauce_alert(headline, url, summary):
+    signal_type, trigger_words = analyze_signal(headline + ' ' + (summary or ''))
+    return {
+        'signal_type': signal_type,
+        'company': 'Crunchbase News',
+        'headline': headline,
+        'summary': (summary or '')[:200],
+        'source_url': url,
+        'trigger_keywords': ', '.join(trigger_words) if trigger_words else signal_type,
+    }
+
+SAUCE_SOURCES = [
+    {'url': 'https://news.crunchbase.com/venture/', 'default_signal': 'funding'},
+    {'url': 'https://news.crunchbase.com/ma/', 'default_signal': 'acquisition'},
+]
+
+def _scrape_sauce_source(source):
+    try:
+        return firecrawl.scrape_url(source['url'])
+    except Exception as e:
+        print(f"Sauce fetch error for {source['url']}: {e}")
+        return None
 
 def fetch_sauce_alerts():
     """Fetch fresh buy-signal alerts by scraping Crunchbase News via Firecrawl."""
     alerts = []
-    firecrawl = FirecrawlClient(FIRECRAWL_API_KEY)
 
-    # Scrape multiple signal sources
-    sources = [
-        {'url': 'https://news.crunchbase.com/venture/', 'default_signal': 'funding'},
-        {'url': 'https://news.crunchbase.com/ma/', 'default_signal': 'acquisition'},
-    ]
+    # Scrape every signal source at once; the wait is the slowest source, not the sum
+    with ThreadPoolExecutor(max_workers=len(SAUCE_SOURCES)) as pool:
+        results = list(pool.map(_scrape_sauce_source, SAUCE_SOURCES))
 
-    for source in sources:
+    for source, result in zip(SAUCE_SOURCES, results):
         try:
-            result = firecrawl.scrape_url(source['url'])
             if not result or 'data' not in result:
                 continue
 
@@ -2056,43 +2650,23 @@ def fetch_sauce_alerts():
             current_summary = None
 
             for line in lines:
-                line = line.strip()
-                # Match ## [Headline](URL) pattern
-                headline_match = re.match(r'^##\s*\[(.+?)\]\((.+?)\)', line)
-                if headline_match:
+                m = _SAUCE_LINE_RE.match(line.strip())
+                if not m:
+                    continue
+                if m.group('title'):
                     # Save previous article if exists
                     if current_headline:
-                        combined_text = current_headline + ' ' + (current_summary or '')
-                        signal_type = classify_signal(combined_text)
-                        trigger_words = extract_trigger_words(combined_text)
-                        alerts.append({
-                            'signal_type': signal_type,
-                            'company': 'Crunchbase News',
-                            'headline': current_headline,
-                            'summary': (current_summary or '')[:200],
-                            'source_url': current_url,
-                            'trigger_keywords': ', '.join(trigger_words) if trigger_words else signal_type,
-                        })
-
-                    current_headline = headline_match.group(1)
-                    current_url = headline_match.group(2)
+                        alerts.append(_sauce_alert(current_headline, current_url, current_summary))
+
+                    current_headline = m.group('title')
+                    current_url = m.group('url')
                     current_summary = None
-                elif current_headline and not current_summary and line and len(line) > 30 and not line.startswith('#') and not line.startswith('[') and not line.startswith('!') and not line.startswith('-'):
-                    current_summary = line
+                elif current_headline and not current_summary:
+                    current_summary = m.group('text')
 
             # Don't forget the last one
             if current_headline:
-                combined_text = current_headline + ' ' + (current_summary or '')
-                signal_type = classify_signal(combined_text)
-                trigger_words = extract_trigger_words(combined_text)
-                alerts.append({
-                    'signal_type': signal_type,
-                    'company': 'Crunchbase News',
-                    'headline': current_headline,
-                    'summary': (current_summary or '')[:200],
-                    'source_url': current_url,
-                    'trigger_keywords': ', '.join(trigger_words) if trigger_words else signal_type,
-                })
+                alerts.append(_sauce_alert(current_headline, current_url, current_summary))
 
         except Exception as e:
             print(f"Sauce fetch error for {source['url']}: {e}")
@@ -2100,7 +2674,15 @@ def fetch_sauce_alerts():
 
     return alerts[:12]  # Cap at 12 alerts
 
+# Today's alerts as last read from sauce_alerts, tagged with the newest row id
+# they were read at. Each request checks MAX(id) (an index seek) and only re-reads
+# the rows when it moved, so a refresh on any worker shows up everywhere. The id
+# is AUTOINCREMENT, so a refresh's rewritten rows never reuse an old watermark.
+_sauce_memo = {'entry': (None, None, None)}  # (date_key, watermark, alerts), swapped as one
+
 @app.route('/api/sauce', methods=['GET'])
+# Only forced refreshes reach Firecrawl; cached reads stay under the default limit
+@limiter.limit("5 per minute", exempt_when=lambda: request.args.get('refresh') != '1')
 def get_sauce():
     """Get today's buy-signal alerts. Returns cached if available, fetches fresh if not."""
     today = datetime.now().strftime('%Y-%m-%d')
@@ -2110,14 +2692,23 @@ def get_sauce():
 
     # Check cache (skip if force refresh)
     if not force_refresh:
+        watermark = c.execute('SELECT MAX(id) FROM sauce_alerts WHERE date_key = ?', (today,)).fetchone()[0]
+        memo_date, memo_watermark, memo_alerts = _sauce_memo['entry']
+        if watermark is not None and memo_date == today and memo_watermark == watermark:
+            conn.close()
+            return jsonify({'success': True, 'alerts': memo_alerts, 'cached': True})
+
         c.execute('SELECT * FROM sauce_alerts WHERE date_key = ? ORDER BY id DESC', (today,))
         cached = c.fetchall()
 
         if cached and len(cached) > 0:
             conn.close()
+            alerts = [dict(row) for row in cached]
+            # Tag with the rows actually read, so a read that raced a refresh is re-read next time
+            _sauce_memo['entry'] = (today, alerts[0]['id'], alerts)
             return jsonify({
                 'success': True,
-                'alerts': [dict(row) for row in cached],
+                'alerts': alerts,
                 'cached': True
             })
 
@@ -2130,12 +2721,12 @@ def get_sauce():
     alerts = fetch_sauce_alerts()
 
     # Store in cache
-    for alert in alerts:
-        c.execute('''INSERT INTO sauce_alerts (signal_type, company, headline, summary, source_url, trigger_keywords, created_at, date_key)
+    now_iso = datetime.now().isoformat()
+    c.executemany('''INSERT INTO sauce_alerts (signal_type, company, headline, summary, source_url, trigger_keywords, created_at, date_key)
                      VALUES (?, ?, ?, ?, ?, ?, ?, ?)''',
-                  (alert['signal_type'], alert['company'], alert['headline'],
-                   alert['summary'], alert['source_url'], alert['trigger_keywords'],
-                   datetime.now().isoformat(), today))
+                  [(alert['signal_type'], alert['company'], alert['headline'],
+                    alert['summary'], alert['source_url'], alert['trigger_keywords'],
+                    now_iso, today) for alert in alerts])
     conn.commit()
     conn.close()
 
@@ -2147,6 +2738,12 @@ def get_sauce():
 
 # ─── Email Guessing ──────────────────────────────────────────────────────────
 
+_URL_DOMAIN_RE = re.compile(r'(?:https?://)?(?:www\.)?([^/]*)')
+
+def _url_domain(url: str) -> str:
+    """Host part of a URL or bare domain, without scheme or leading www."""
+    return _URL_DOMAIN_RE.match(url).group(1)
+
 def guess_email(name: str, company_domain: str) -> list:
     """Generate common email format guesses from name + domain."""
     if not name or not company_domain:
@@ -2157,17 +2754,20 @@ def guess_email(name: str, company_domain: str) -> list:
     first = parts[0]
     last = parts[-1]
     # Clean domain (remove http/www)
-    domain = company_domain.replace('https://', '').replace('http://', '').replace('www.', '').split('/')[0]
-    guesses = [
-        f"{first}.{last}@{domain}",
-        f"{first[0]}{last}@{domain}",
-        f"{first}@{domain}",
-        f"{first}{last}@{domain}",
-        f"{first}_{last}@{domain}",
-        f"{first[0]}.{last}@{domain}",
-        f"{last}.{first}@{domain}",
+    domain = _url_domain(company_domain)
+    if not domain:
+        return []
+    at = '@' + domain
+    fi = first[0]
+    return [
+        f"{first}.{last}{at}",
+        f"{fi}{last}{at}",
+        f"{first}{at}",
+        f"{first}{last}{at}",
+        f"{first}_{last}{at}",
+        f"{fi}.{last}{at}",
+        f"{last}.{first}{at}",
     ]
-    return guesses
 
 @app.route('/api/guess-email', methods=['POST'])
 @login_required
@@ -2179,7 +2779,7 @@ def guess_email_route():
     # Try to derive domain from source URL, then company name
     domain = ''
     if source_url:
-        domain = source_url.replace('https://', '').replace('http://', '').replace('www.', '').split('/')[0]
+        domain = _url_domain(source_url)
     elif company:
         # Simple company-to-domain guess
         clean = company.lower().replace(' ', '').replace(',', '').replace('.', '').replace('inc', '').replace('llc', '').replace('corp', '').replace('ltd', '')
@@ -2201,28 +2801,31 @@ def check_duplicate():
     conn = get_db()
     c = conn.cursor()
     duplicates = []
+    seen_ids = set()
 
     # Exact email match
     if email:
         c.execute('SELECT id, name, company, email FROM prospects WHERE LOWER(email) = ?', (email,))
         for row in c.fetchall():
             duplicates.append({**dict(row), 'match_type': 'exact_email'})
+            seen_ids.add(row['id'])
 
     # Name + company match
     if name and company:
         c.execute('SELECT id, name, company, email FROM prospects WHERE LOWER(name) = ? AND LOWER(company) = ?', (name, company))
         for row in c.fetchall():
-            if not any(d['id'] == row['id'] for d in duplicates):
+            if row['id'] not in seen_ids:
                 duplicates.append({**dict(row), 'match_type': 'exact_name_company'})
+                seen_ids.add(row['id'])
 
     # Fuzzy name match (same company)
     if name and company:
         c.execute('SELECT id, name, company, email FROM prospects WHERE LOWER(company) = ?', (company,))
+        name_parts = set(name.split())
         for row in c.fetchall():
-            if not any(d['id'] == row['id'] for d in duplicates):
+            if row['id'] not in seen_ids:
                 existing_name = row['name'].lower()
                 # Check if names share a significant portion
-                name_parts = set(name.split())
                 existing_parts = set(existing_name.split())
                 overlap = name_parts & existing_parts
                 if len(overlap) >= 1 and (len(overlap) / max(len(name_parts), len(existing_parts))) > 0.5:
@@ -2231,6 +2834,23 @@ def check_duplicate():
     conn.close()
     return jsonify({'success': True, 'duplicates': duplicates})
 
+# The whole field merge is one UPDATE ... FROM the merged row: blank fields are
+# filled from it, its notes are appended and the larger deal size wins.
+# RETURNING yields nothing when either prospect is missing.
+MERGE_FILL_FIELDS = ('email', 'phone', 'title', 'linkedin_url', 'source')
+SQL_MERGE_PROSPECT = (
+    'UPDATE prospects SET '
+    + ''.join(f"{field} = COALESCE(NULLIF(prospects.{field}, ''), NULLIF(m.{field}, ''), prospects.{field}), "
+              for field in MERGE_FILL_FIELDS)
+    + "notes = CASE WHEN COALESCE(m.notes, '') = '' THEN COALESCE(prospects.notes, '') "
+      "ELSE TRIM(COALESCE(prospects.notes, '') || char(10) || '[Merged] ' || m.notes, ' ' || char(9, 10, 13)) END, "
+      'deal_size = CASE WHEN COALESCE(m.deal_size, 0) > COALESCE(prospects.deal_size, 0) '
+      'THEN m.deal_size ELSE prospects.deal_size END '
+    'FROM (SELECT * FROM prospects WHERE id = :merge) AS m '
+    'WHERE prospects.id = :keep RETURNING prospects.id')
+SQL_MOVE_TASKS = 'UPDATE tasks SET prospect_id = ? WHERE prospect_id = ?'
+SQL_DELETE_PROSPECT = 'DELETE FROM prospects WHERE id = ?'
+
 @app.route('/api/prospects/merge', methods=['POST'])
 @login_required
 def merge_prospects():
@@ -2241,51 +2861,19 @@ def merge_prospects():
 
     if not keep_id or not merge_id:
         return jsonify({'success': False, 'error': 'Both keep_id and merge_id required'}), 400
+    if str(keep_id) == str(merge_id):
+        return jsonify({'success': False, 'error': 'Cannot merge a prospect into itself'}), 400
 
-    conn = get_db()
-    c = conn.cursor()
-
-    c.execute('SELECT * FROM prospects WHERE id = ?', (keep_id,))
-    keep = c.fetchone()
-    c.execute('SELECT * FROM prospects WHERE id = ?', (merge_id,))
-    merge = c.fetchone()
-
-    if not keep or not merge:
-        conn.close()
-        return jsonify({'success': False, 'error': 'Prospect not found'}), 404
-
-    keep = dict(keep)
-    merge = dict(merge)
-
-    # Fill in missing fields from merge into keep
-    updates = {}
-    for field in ['email', 'phone', 'title', 'linkedin_url', 'source']:
-        if not keep.get(field) and merge.get(field):
-            updates[field] = merge[field]
-
-    # Combine notes
-    merged_notes = (keep.get('notes') or '')
-    if merge.get('notes'):
-        merged_notes = f"{merged_notes}\n[Merged] {merge['notes']}".strip()
-    updates['notes'] = merged_notes
+    with db_pool.acquire() as conn, conn:
+        # Merge, task move and delete commit together under one write lock
+        conn.execute('BEGIN IMMEDIATE')
+        merged = conn.execute(SQL_MERGE_PROSPECT, {'keep': keep_id, 'merge': merge_id}).fetchone()
+        if not merged:
+            return jsonify({'success': False, 'error': 'Prospect not found'}), 404
 
-    # Use higher deal size
-    if (merge.get('deal_size') or 0) > (keep.get('deal_size') or 0):
-        updates['deal_size'] = merge['deal_size']
-
-    # Apply updates
-    if updates:
-        set_clause = ', '.join(f"{k} = ?" for k in updates)
-        values = list(updates.values()) + [keep_id]
-        c.execute(f"UPDATE prospects SET {set_clause} WHERE id = ?", values)
-
-    # Move tasks from merge to keep
-    c.execute('UPDATE tasks SET prospect_id = ? WHERE prospect_id = ?', (keep_id, merge_id))
-
-    # Delete merged prospect
-    c.execute('DELETE FROM prospects WHERE id = ?', (merge_id,))
-    conn.commit()
-    conn.close()
+        # Move tasks from merge to keep, then drop the merged prospect
+        conn.execute(SQL_MOVE_TASKS, (keep_id, merge_id))
+        conn.execute(SQL_DELETE_PROSPECT, (merge_id,))
 
     return jsonify({'success': True, 'message': 'Prospects merged successfully'})
 
@@ -2315,132 +2903,236 @@ LEVEL_THRESHOLDS = [
     (4000, 'Legend', 'diamond'),
     (6000, 'Origin Master', 'diamond'),
 ]
+_LEVEL_XP = [threshold for threshold, _, _ in LEVEL_THRESHOLDS]
+
+@lru_cache(maxsize=2048)
+def _level_for_xp(total_xp):
+    """(level, name, tier, next_threshold, progress) for a total. Depends only on
+    the total and the fixed thresholds, so cached entries never go stale."""
+    # Totals below the first threshold still count as level 1
+    idx = max(bisect.bisect_right(_LEVEL_XP, total_xp) - 1, 0)
+    threshold, level_name, tier = LEVEL_THRESHOLDS[idx]
+    next_threshold = _LEVEL_XP[idx + 1] if idx + 1 < len(_LEVEL_XP) else threshold + 2000
+    progress = min(100, int((total_xp / next_threshold) * 100)) if next_threshold > 0 else 100
+    return idx + 1, level_name, tier, next_threshold, progress
 
 def get_level_info(total_xp):
     """Get current level name and tier based on total XP."""
-    level_name = 'Rookie'
-    tier = 'bronze'
-    level_num = 1
-    next_threshold = 100
-    for i, (threshold, name, t) in enumerate(LEVEL_THRESHOLDS):
-        if total_xp >= threshold:
-            level_name = name
-            tier = t
-            level_num = i + 1
-            next_threshold = LEVEL_THRESHOLDS[i + 1][0] if i + 1 < len(LEVEL_THRESHOLDS) else threshold + 2000
+    level_num, level_name, tier, next_threshold, progress = _level_for_xp(total_xp)
     return {
         'level': level_num,
         'name': level_name,
         'tier': tier,
         'total_xp': total_xp,
         'next_level_xp': next_threshold,
-        'progress': min(100, int((total_xp / next_threshold) * 100)) if next_threshold > 0 else 100
+        'progress': progress
     }
 
-def award_xp(action, detail=''):
-    """Award XP for an action, update streak and challenge progress."""
+SQL_INSERT_XP = 'INSERT INTO xp_log (action, xp_earned, detail, created_at, user_id) VALUES (?, ?, ?, ?, ?)'
+SQL_XP_TOTAL = 'SELECT COALESCE(SUM(total), 0) FROM xp_totals WHERE user_id IN (?, 0)'
+SQL_ADD_XP_TOTAL = ('INSERT INTO xp_totals (user_id, total) VALUES (?, ?) '
+                    'ON CONFLICT(user_id) DO UPDATE SET total = total + excluded.total')
+# Newest-first walk of the rowid (id is INTEGER PRIMARY KEY), so no sort step
+SQL_RECENT_XP = ('SELECT id, action, xp_earned, detail, created_at FROM xp_log '
+                 'WHERE user_id = ? OR user_id IS NULL ORDER BY id DESC LIMIT 10')
+
+def _apply_xp_progress(c, action, now, uid):
+    """Streak and challenge bookkeeping for one award, on the flush transaction's cursor.
+    Returns the bonus XP from any challenge it completed."""
+    bonus = 0
+    now_iso = now.isoformat()
+    today_str = now.strftime('%Y-%m-%d')
+
+    # Update streak
+    c.execute('SELECT * FROM streaks LIMIT 1')
+    streak = c.fetchone()
+    if streak:
+        streak = dict(streak)
+        last_date = streak.get('last_active_date', '')
+        if last_date == today_str:
+            pass  # Already counted today
+        elif last_date == (now - timedelta(days=1)).strftime('%Y-%m-%d'):
+            new_streak = streak['current_streak'] + 1
+            longest = max(streak['longest_streak'], new_streak)
+            c.execute('UPDATE streaks SET current_streak = ?, longest_streak = ?, last_active_date = ?, updated_at = ? WHERE id = ?',
+                      (new_streak, longest, today_str, now_iso, streak['id']))
+        else:
+            c.execute('UPDATE streaks SET current_streak = 1, last_active_date = ?, updated_at = ? WHERE id = ?',
+                      (today_str, now_iso, streak['id']))
+    else:
+        c.execute('INSERT INTO streaks (current_streak, longest_streak, last_active_date, updated_at) VALUES (1, 1, ?, ?)',
+                  (today_str, now_iso))
+
+    # Update challenge progress
+    year, week, _ = now.isocalendar()
+    week_key = f'{year}-W{week:02d}'
+    c.execute('SELECT * FROM challenges WHERE is_active = 1 AND target_action = ?', (action,))
+    for ch in c.fetchall():
+        ch = dict(ch)
+        date_key = today_str if ch['challenge_type'] == 'daily' else week_key
+        c.execute('SELECT * FROM challenge_progress WHERE challenge_id = ? AND date_key = ?', (ch['id'], date_key))
+        prog = c.fetchone()
+        if prog:
+            prog = dict(prog)
+            if not prog['completed']:
+                new_count = prog['current_count'] + 1
+                completed = 1 if new_count >= ch['target_count'] else 0
+                c.execute('UPDATE challenge_progress SET current_count = ?, completed = ?, completed_at = ? WHERE id = ?',
+                          (new_count, completed, now_iso if completed else None, prog['id']))
+                if completed:
+                    c.execute(SQL_INSERT_XP, ('challenge_completed', ch['xp_reward'], ch['title'], now_iso, uid))
+                    bonus += ch['xp_reward']
+        else:
+            completed = 1 if 1 >= ch['target_count'] else 0
+            c.execute('INSERT INTO challenge_progress (challenge_id, current_count, completed, completed_at, date_key) VALUES (?,?,?,?,?)',
+                      (ch['id'], 1, completed, now_iso if completed else None, date_key))
+            if completed:
+                c.execute(SQL_INSERT_XP, ('challenge_completed', ch['xp_reward'], ch['title'], now_iso, uid))
+                bonus += ch['xp_reward']
+    return bonus
+
+# XP awards are queued and written in batches: award_xp returns immediately and
+# a background task applies everything pending every XP_FLUSH_INTERVAL in one
+# transaction. A backlog of XP_FLUSH_BATCH awards is flushed inline instead.
+XP_FLUSH_INTERVAL = 0.05
+XP_FLUSH_BATCH = 100
+_xp_queue = deque()
+_xp_write_lock = threading.Lock()
+
+def award_xp(action, detail='', user_id=None):
+    """Queue XP for an action; streak and challenge progress are updated on flush.
+    user_id defaults to the session's user."""
     xp = XP_ACTIONS.get(action, 0)
     if xp > 0:
-        conn = get_db()
-        c = conn.cursor()
+        _xp_queue.append((action, xp, detail, user_id or session.get('user_id')))
+        if len(_xp_queue) >= XP_FLUSH_BATCH:
+            flush_xp()
+    return xp
+
+def flush_xp():
+    """Write all queued XP awards, and their streak/challenge updates, in one transaction."""
+    with _xp_write_lock:
+        if not _xp_queue:
+            return
+        # popleft, not clear(): awards queued while we copy must not be lost
+        batch = [_xp_queue.popleft() for _ in range(len(_xp_queue))]
+        # One clock read for the batch; awards are at most XP_FLUSH_INTERVAL old
         now = datetime.now()
         now_iso = now.isoformat()
-        today_str = now.strftime('%Y-%m-%d')
-        uid = session.get('user_id')
+        try:
+            with db_pool.acquire() as conn:
+                c = conn.cursor()
+                c.executemany(SQL_INSERT_XP, [(action, xp, detail, now_iso, uid)
+                                              for action, xp, detail, uid in batch])
+                earned = {}
+                for action, xp, _, uid in batch:
+                    key = uid or 0
+                    earned[key] = earned.get(key, 0) + xp + _apply_xp_progress(c, action, now, uid)
+                c.executemany(SQL_ADD_XP_TOTAL, earned.items())
+                conn.commit()
+        except sqlite3.Error as e:
+            print(f"XP flush error: {e}")
+            _xp_queue.extendleft(reversed(batch))
+            return
+        for key, xp in earned.items():
+            _xp_totals[key] = _xp_totals.get(key, 0) + xp
+        invalidate_xp_cache()
+
+def _xp_writer():
+    while True:
+        socketio.sleep(XP_FLUSH_INTERVAL)
+        flush_xp()
+
+socketio.start_background_task(_xp_writer)
+atexit.register(flush_xp)
+
+# Running XP per user_id (0 holds the shared rows from before accounts). The
+# xp_totals table is checked against xp_log at startup and rebuilt if they
+# ever disagree; after that flush_xp advances both, so a total is two dict
+# lookups here, or a primary-key read when several workers share the DB.
+with db_pool.acquire() as _conn, _conn:
+    # Under the write lock so another worker's flush can't land between the two reads
+    _conn.execute('BEGIN IMMEDIATE')
+    _xp_totals = {uid or 0: total for uid, total in
+                  _conn.execute('SELECT user_id, COALESCE(SUM(xp_earned), 0) FROM xp_log GROUP BY user_id')}
+    if dict(_conn.execute('SELECT user_id, total FROM xp_totals').fetchall()) != _xp_totals:
+        _conn.execute('DELETE FROM xp_totals')
+        _conn.executemany('INSERT INTO xp_totals (user_id, total) VALUES (?, ?)', _xp_totals.items())
+
+def xp_total(uid):
+    """Total XP for a user: their own awards plus the shared rows, pending awards included."""
+    flush_xp()
+    if SOCKETIO_MESSAGE_QUEUE:
+        with db_pool.acquire() as conn:
+            return conn.execute(SQL_XP_TOTAL, (uid,)).fetchone()[0]
+    return _xp_totals.get(uid, 0) + _xp_totals.get(0, 0)
+
+# get_xp serves cached bodies from _xp_cache (see invalidate_xp_cache)
+
+def _xp_payload(uid, total_xp, today):
+    """Level info plus recent actions, streak and challenge progress for get_xp."""
+    with db_pool.acquire() as conn:
+        # Plain tuples zipped against the column names once, instead of Row objects
+        recent_cur = conn.cursor()
+        recent_cur.row_factory = None
+        recent_cur.execute(SQL_RECENT_XP, (uid,))
+        keys = [d[0] for d in recent_cur.description]
+        recent = [dict(zip(keys, row)) for row in recent_cur.fetchall()]
 
-        c.execute('INSERT INTO xp_log (action, xp_earned, detail, created_at, user_id) VALUES (?, ?, ?, ?, ?)',
-                  (action, xp, detail, now_iso, uid))
+        c = conn.cursor()
 
-        # Update streak
+        # Streak info
         c.execute('SELECT * FROM streaks LIMIT 1')
         streak = c.fetchone()
-        if streak:
-            streak = dict(streak)
-            last_date = streak.get('last_active_date', '')
-            if last_date == today_str:
-                pass  # Already counted today
-            elif last_date == (now - timedelta(days=1)).strftime('%Y-%m-%d'):
-                new_streak = streak['current_streak'] + 1
-                longest = max(streak['longest_streak'], new_streak)
-                c.execute('UPDATE streaks SET current_streak = ?, longest_streak = ?, last_active_date = ?, updated_at = ? WHERE id = ?',
-                          (new_streak, longest, today_str, now_iso, streak['id']))
-            else:
-                c.execute('UPDATE streaks SET current_streak = 1, last_active_date = ?, updated_at = ? WHERE id = ?',
-                          (today_str, now_iso, streak['id']))
-        else:
-            c.execute('INSERT INTO streaks (current_streak, longest_streak, last_active_date, updated_at) VALUES (1, 1, ?, ?)',
-                      (today_str, now_iso))
+        streak_info = dict(streak) if streak else {'current_streak': 0, 'longest_streak': 0}
 
-        # Update challenge progress
-        year, week, _ = now.isocalendar()
+        # Active challenges with progress
+        year, week, _ = datetime.now().isocalendar()
         week_key = f'{year}-W{week:02d}'
-        c.execute('SELECT * FROM challenges WHERE is_active = 1 AND target_action = ?', (action,))
+        c.execute('SELECT * FROM challenges WHERE is_active = 1')
+        challenges = []
         for ch in c.fetchall():
             ch = dict(ch)
-            date_key = today_str if ch['challenge_type'] == 'daily' else week_key
-            c.execute('SELECT * FROM challenge_progress WHERE challenge_id = ? AND date_key = ?', (ch['id'], date_key))
+            date_key = today if ch['challenge_type'] == 'daily' else week_key
+            c.execute('SELECT current_count, completed FROM challenge_progress WHERE challenge_id = ? AND date_key = ?',
+                      (ch['id'], date_key))
             prog = c.fetchone()
-            if prog:
-                prog = dict(prog)
-                if not prog['completed']:
-                    new_count = prog['current_count'] + 1
-                    completed = 1 if new_count >= ch['target_count'] else 0
-                    c.execute('UPDATE challenge_progress SET current_count = ?, completed = ?, completed_at = ? WHERE id = ?',
-                              (new_count, completed, now_iso if completed else None, prog['id']))
-                    if completed:
-                        c.execute('INSERT INTO xp_log (action, xp_earned, detail, created_at, user_id) VALUES (?, ?, ?, ?, ?)',
-                                  ('challenge_completed', ch['xp_reward'], ch['title'], now_iso, uid))
-            else:
-                completed = 1 if 1 >= ch['target_count'] else 0
-                c.execute('INSERT INTO challenge_progress (challenge_id, current_count, completed, completed_at, date_key) VALUES (?,?,?,?,?)',
-                          (ch['id'], 1, completed, now_iso if completed else None, date_key))
-                if completed:
-                    c.execute('INSERT INTO xp_log (action, xp_earned, detail, created_at, user_id) VALUES (?, ?, ?, ?, ?)',
-                              ('challenge_completed', ch['xp_reward'], ch['title'], now_iso, uid))
+            ch['current_count'] = prog['current_count'] if prog else 0
+            ch['completed'] = bool(prog['completed']) if prog else False
+            challenges.append(ch)
 
-        conn.commit()
-        conn.close()
-    return xp
+    level_info = get_level_info(total_xp)
+    level_info['recent_actions'] = recent
+    level_info['streak'] = streak_info
+    level_info['challenges'] = challenges
+    return {'success': True, **level_info}
 
 @app.route('/api/xp', methods=['GET'])
 @login_required
 def get_xp():
     """Get total XP, level info, streak, and challenge progress."""
     uid = session.get('user_id')
-    conn = get_db()
-    c = conn.cursor()
-    c.execute('SELECT COALESCE(SUM(xp_earned), 0) as total FROM xp_log WHERE user_id = ? OR user_id IS NULL', (uid,))
-    total_xp = c.fetchone()['total']
-    c.execute('SELECT * FROM xp_log WHERE user_id = ? OR user_id IS NULL ORDER BY id DESC LIMIT 10', (uid,))
-    recent = [dict(row) for row in c.fetchall()]
-
-    # Streak info
-    c.execute('SELECT * FROM streaks LIMIT 1')
-    streak = c.fetchone()
-    streak_info = dict(streak) if streak else {'current_streak': 0, 'longest_streak': 0}
-
-    # Active challenges with progress
+    total_xp = xp_total(uid)
     today = datetime.now().strftime('%Y-%m-%d')
-    year, week, _ = datetime.now().isocalendar()
-    week_key = f'{year}-W{week:02d}'
-    c.execute('SELECT * FROM challenges WHERE is_active = 1')
-    challenges = []
-    for ch in c.fetchall():
-        ch = dict(ch)
-        date_key = today if ch['challenge_type'] == 'daily' else week_key
-        c.execute('SELECT current_count, completed FROM challenge_progress WHERE challenge_id = ? AND date_key = ?',
-                  (ch['id'], date_key))
-        prog = c.fetchone()
-        ch['current_count'] = prog['current_count'] if prog else 0
-        ch['completed'] = bool(prog['completed']) if prog else False
-        challenges.append(ch)
+    if SOCKETIO_MESSAGE_QUEUE:
+        return jsonify(_xp_payload(uid, total_xp, today))
 
-    conn.close()
-    level_info = get_level_info(total_xp)
-    level_info['recent_actions'] = recent
-    level_info['streak'] = streak_info
-    level_info['challenges'] = challenges
-    return jsonify({'success': True, **level_info})
+    version = _xp_cache['version']
+    etag = f'{uid}-{version}-{today}'
+    if request.if_none_match.contains(etag):
+        resp = Response(status=304)
+    else:
+        cached = _xp_cache['bodies'].get(uid)
+        if cached and cached[0] == etag:
+            body = cached[1]
+        else:
+            body = _orjson_dumps(_xp_payload(uid, total_xp, today))
+            # Skip the store if a flush landed while we were querying
+            if version == _xp_cache['version']:
+                _xp_cache['bodies'][uid] = (etag, body)
+        resp = Response(body, mimetype='application/json')
+    resp.set_etag(etag)
+    return resp
 
 @app.route('/api/xp/award', methods=['POST'])
 @login_required
@@ -2450,13 +3142,7 @@ def award_xp_route():
     detail = data.get('detail', '')
     xp = award_xp(action, detail)
     # Return updated level info
-    uid = session.get('user_id')
-    conn = get_db()
-    c = conn.cursor()
-    c.execute('SELECT COALESCE(SUM(xp_earned), 0) as total FROM xp_log WHERE user_id = ? OR user_id IS NULL', (uid,))
-    total_xp = c.fetchone()['total']
-    conn.close()
-    level_info = get_level_info(total_xp)
+    level_info = get_level_info(xp_total(session.get('user_id')))
     return jsonify({'success': True, 'xp_earned': xp, **level_info})
 
 # ─── Activity Timeline ────────────────────────────────────────────────────────
@@ -2467,9 +3153,7 @@ def get_prospect_activity(prospect_id):
     conn = get_db()
     c = conn.cursor()
     c.execute('SELECT * FROM activity_log WHERE prospect_id = ? ORDER BY created_at DESC LIMIT 50', (prospect_id,))
-    events = [dict(row) for row in c.fetchall()]
-    conn.close()
-    return jsonify({'success': True, 'data': events})
+    return stream_json_rows(conn, c)
 
 @app.route('/api/prospects/<prospect_id>/activity', methods=['POST'])
 @login_required
@@ -2483,14 +3167,25 @@ def add_prospect_activity(prospect_id):
 @app.route('/api/accounts', methods=['GET'])
 @login_required
 def get_accounts():
+    page = request.args.get('page', 1, type=int)
+    per_page = request.args.get('per_page', 50, type=int)
+    per_page = min(per_page, 200)
+    offset = (page - 1) * per_page
+
     conn = get_db()
     c = conn.cursor()
+    c.execute('SELECT COUNT(*) as total FROM accounts')
+    total = c.fetchone()['total']
+    # Paginate accounts first, then aggregate only that page's prospects
+    # (served from idx_prospects_account_deal without touching the table)
     c.execute('''SELECT a.*, COUNT(p.id) as prospect_count, COALESCE(SUM(p.deal_size), 0) as total_deal_value
-                 FROM accounts a LEFT JOIN prospects p ON p.account_id = a.id
-                 GROUP BY a.id ORDER BY a.name ASC''')
-    accounts = [dict(row) for row in c.fetchall()]
-    conn.close()
-    return jsonify({'success': True, 'data': accounts})
+                 FROM (SELECT * FROM accounts ORDER BY name ASC LIMIT ? OFFSET ?) a
+                 LEFT JOIN prospects p ON p.account_id = a.id
+                 GROUP BY a.id ORDER BY a.name ASC''', (per_page, offset))
+    return stream_json_rows(conn, c, extra={
+        'total': total, 'page': page, 'per_page': per_page,
+        'total_pages': max(1, (total + per_page - 1) // per_page)
+    })
 
 @app.route('/api/accounts', methods=['POST'])
 @login_required
@@ -2614,12 +3309,14 @@ def get_sequences():
     conn = get_db()
     c = conn.cursor()
     c.execute('SELECT * FROM email_sequences ORDER BY created_at DESC')
-    sequences = [dict(row) for row in c.fetchall()]
-    for seq in sequences:
-        c.execute('SELECT * FROM sequence_steps WHERE sequence_id = ? ORDER BY step_number ASC', (seq['id'],))
-        seq['steps'] = [dict(row) for row in c.fetchall()]
-    conn.close()
-    return jsonify({'success': True, 'data': sequences})
+
+    def with_steps(row):
+        seq = dict(row)
+        steps = conn.execute('SELECT * FROM sequence_steps WHERE sequence_id = ? ORDER BY step_number ASC', (seq['id'],))
+        seq['steps'] = [dict(step) for step in steps]
+        return seq
+
+    return stream_json_rows(conn, c, row_fn=with_steps)
 
 @app.route('/api/sequences', methods=['POST'])
 @login_required
@@ -2734,6 +3431,8 @@ def get_prospect_sequences(prospect_id):
 
 # ─── Contact Enrichment ──────────────────────────────────────────────────────
 
+_NON_ALNUM_RE = re.compile(r'[^a-z0-9]')
+
 @app.route('/api/prospects/<prospect_id>/enrich', methods=['POST'])
 @login_required
 def enrich_prospect(prospect_id):
@@ -2759,7 +3458,7 @@ def enrich_prospect(prospect_id):
             except Exception:
                 pass
         if not domain and company:
-            domain = re.sub(r'[^a-z0-9]', '', company.lower()) + '.com'
+            domain = _NON_ALNUM_RE.sub('', company.lower()) + '.com'
         if domain:
             parts = name.strip().split()
             if len(parts) >= 2:
@@ -2783,7 +3482,7 @@ def enrich_prospect(prospect_id):
     hunter_key = os.environ.get('HUNTER_API_KEY', '')
     if hunter_key and prospect.get('email'):
         try:
-            resp = requests.get(f'https://api.hunter.io/v2/email-verifier?email={prospect["email"]}&api_key={hunter_key}', timeout=10)
+            resp = http_session.get(f'https://api.hunter.io/v2/email-verifier?email={prospect["email"]}&api_key={hunter_key}', timeout=10)
             hdata = resp.json().get('data', {})
             enrichment['email_verification'] = {
                 'status': hdata.get('status', 'unknown'),
@@ -2803,8 +3502,8 @@ def enrich_prospect(prospect_id):
                 pass
         if domain_for_clearbit:
             try:
-                resp = requests.get(f'https://company.clearbit.com/v2/companies/find?domain={domain_for_clearbit}',
-                                    headers={'Authorization': f'Bearer {clearbit_key}'}, timeout=10)
+                resp = http_session.get(f'https://company.clearbit.com/v2/companies/find?domain={domain_for_clearbit}',
+                                        headers={'Authorization': f'Bearer {clearbit_key}'}, timeout=10)
                 if resp.status_code == 200:
                     cdata = resp.json()
                     enrichment['company_info'] = {
@@ -2866,17 +3565,16 @@ def get_leaderboard():
                  COALESCE(SUM(x.xp_earned), 0) as total_xp
                  FROM users u LEFT JOIN xp_log x ON x.user_id = u.id
                  GROUP BY u.id ORDER BY total_xp DESC LIMIT 20''')
-    leaders = []
-    for row in c.fetchall():
+
+    def with_level(row):
         entry = dict(row)
         level_info = get_level_info(entry['total_xp'])
         entry['level'] = level_info['level']
         entry['level_name'] = level_info['name']
         entry['tier'] = level_info['tier']
-        leaders.append(entry)
-    current_uid = session.get('user_id')
-    conn.close()
-    return jsonify({'success': True, 'data': leaders, 'current_user_id': current_uid})
+        return entry
+
+    return stream_json_rows(conn, c, row_fn=with_level, extra={'current_user_id': session.get('user_id')})
 
 # ─── Forum Moderation ────────────────────────────────────────────────────────
 
@@ -2892,10 +3590,7 @@ def edit_forum_post(post_id):
     if not post:
         conn.close()
         return jsonify({'success': False, 'error': 'Post not found'}), 404
-    c.execute('SELECT role FROM users WHERE id = ?', (user_id,))
-    user = c.fetchone()
-    is_admin = user and user['role'] in ('admin', 'moderator')
-    if post['user_id'] != user_id and not is_admin:
+    if post['user_id'] != user_id and not is_moderator():
         conn.close()
         return jsonify({'success': False, 'error': 'Not authorized'}), 403
     c.execute('UPDATE forum_posts SET title = ?, body = ?, updated_at = ? WHERE id = ?',
@@ -2915,10 +3610,7 @@ def delete_forum_post(post_id):
     if not post:
         conn.close()
         return jsonify({'success': False, 'error': 'Post not found'}), 404
-    c.execute('SELECT role FROM users WHERE id = ?', (user_id,))
-    user = c.fetchone()
-    is_admin = user and user['role'] in ('admin', 'moderator')
-    if post['user_id'] != user_id and not is_admin:
+    if post['user_id'] != user_id and not is_moderator():
         conn.close()
         return jsonify({'success': False, 'error': 'Not authorized'}), 403
     c.execute('DELETE FROM forum_comments WHERE post_id = ?', (post_id,))
@@ -2927,156 +3619,314 @@ def delete_forum_post(post_id):
     conn.close()
     return jsonify({'success': True})
 
+def _comment_write_denied(c, comment_id):
+    """Error response for a guarded comment UPDATE/DELETE that matched no row."""
+    c.execute(SQL_COMMENT_EXISTS, (comment_id,))
+    if not c.fetchone():
+        return jsonify({'success': False, 'error': 'Comment not found'}), 404
+    return jsonify({'success': False, 'error': 'Not authorized'}), 403
+
 @app.route('/api/forum/comments/<int:comment_id>', methods=['PUT'])
 @login_required
 def edit_forum_comment(comment_id):
     data = request.json
     user_id = session.get('user_id')
-    conn = get_db()
-    c = conn.cursor()
-    c.execute('SELECT user_id FROM forum_comments WHERE id = ?', (comment_id,))
-    comment = c.fetchone()
-    if not comment:
-        conn.close()
-        return jsonify({'success': False, 'error': 'Comment not found'}), 404
-    c.execute('SELECT role FROM users WHERE id = ?', (user_id,))
-    user = c.fetchone()
-    is_admin = user and user['role'] in ('admin', 'moderator')
-    if comment['user_id'] != user_id and not is_admin:
-        conn.close()
-        return jsonify({'success': False, 'error': 'Not authorized'}), 403
-    c.execute('UPDATE forum_comments SET body = ? WHERE id = ?', (data.get('body'), comment_id))
-    conn.commit()
-    conn.close()
-    return jsonify({'success': True})
+    with db_pool.acquire() as conn:
+        c = conn.cursor()
+        # Ownership/role check and write in one statement
+        c.execute(SQL_UPDATE_COMMENT_BODY, (data.get('body'), comment_id, user_id, is_moderator()))
+        if c.rowcount == 0:
+            return _comment_write_denied(c, comment_id)
+        conn.commit()
+    return '', 204
 
 @app.route('/api/forum/comments/<int:comment_id>', methods=['DELETE'])
 @login_required
 def delete_forum_comment(comment_id):
     user_id = session.get('user_id')
-    conn = get_db()
-    c = conn.cursor()
-    c.execute('SELECT user_id FROM forum_comments WHERE id = ?', (comment_id,))
-    comment = c.fetchone()
-    if not comment:
-        conn.close()
-        return jsonify({'success': False, 'error': 'Comment not found'}), 404
-    c.execute('SELECT role FROM users WHERE id = ?', (user_id,))
-    user = c.fetchone()
-    is_admin = user and user['role'] in ('admin', 'moderator')
-    if comment['user_id'] != user_id and not is_admin:
-        conn.close()
-        return jsonify({'success': False, 'error': 'Not authorized'}), 403
-    c.execute('DELETE FROM forum_comments WHERE id = ?', (comment_id,))
-    conn.commit()
-    conn.close()
-    return jsonify({'success': True})
+    with db_pool.acquire() as conn:
+        c = conn.cursor()
+        c.execute(SQL_DELETE_COMMENT, (comment_id, user_id, is_moderator()))
+        if c.rowcount == 0:
+            return _comment_write_denied(c, comment_id)
+        conn.commit()
+    return '', 204
 
 @app.route('/api/forum/posts/<int:post_id>/report', methods=['POST'])
 @login_required
 def report_forum_post(post_id):
     data = request.json
     user_id = session.get('user_id')
-    conn = get_db()
-    c = conn.cursor()
-    c.execute('INSERT INTO forum_reports (post_id, reporter_user_id, reason, created_at) VALUES (?,?,?,?)',
-              (post_id, user_id, data.get('reason', ''), datetime.now().isoformat()))
-    c.execute('UPDATE forum_posts SET is_reported = 1 WHERE id = ?', (post_id,))
-    conn.commit()
-    conn.close()
-    return jsonify({'success': True})
+    with db_pool.acquire() as conn, conn:
+        # Take the write lock up front so both statements commit together
+        conn.execute('BEGIN IMMEDIATE')
+        cur = conn.execute(SQL_INSERT_REPORT_POST, (post_id, user_id, data.get('reason', ''), fast_now()))
+        # A repeat report from the same user is a no-op
+        filed = cur.rowcount > 0
+        if filed:
+            conn.execute(SQL_UPDATE_POST_REPORTED, (post_id,))
+    if filed:
+        invalidate_reports_cache()
+    return '', 204
 
 @app.route('/api/forum/comments/<int:comment_id>/report', methods=['POST'])
 @login_required
 def report_forum_comment(comment_id):
     data = request.json
     user_id = session.get('user_id')
-    conn = get_db()
-    c = conn.cursor()
-    c.execute('INSERT INTO forum_reports (comment_id, reporter_user_id, reason, created_at) VALUES (?,?,?,?)',
-              (comment_id, user_id, data.get('reason', ''), datetime.now().isoformat()))
-    c.execute('UPDATE forum_comments SET is_reported = 1 WHERE id = ?', (comment_id,))
-    conn.commit()
-    conn.close()
-    return jsonify({'success': True})
+    with db_pool.acquire() as conn, conn:
+        conn.execute('BEGIN IMMEDIATE')
+        cur = conn.execute(SQL_INSERT_REPORT_COMMENT, (comment_id, user_id, data.get('reason', ''), fast_now()))
+        filed = cur.rowcount > 0
+        if filed:
+            conn.execute(SQL_UPDATE_COMMENT_REPORTED, (comment_id,))
+    if filed:
+        invalidate_reports_cache()
+    return '', 204
+
+# Pending-report pages are served from memory for a few seconds between
+# admin polls; filing or resolving a report drops every cached page.
+REPORTS_CACHE_TTL = 5
+_reports_cache = {'version': 0, 'pages': {}}
+
+def invalidate_reports_cache():
+    _reports_cache['version'] += 1
+    _reports_cache['pages'] = {}
 
 @app.route('/api/admin/reports', methods=['GET'])
 @login_required
 def get_reports():
-    user_id = session.get('user_id')
-    conn = get_db()
-    c = conn.cursor()
-    c.execute('SELECT role FROM users WHERE id = ?', (user_id,))
-    user = c.fetchone()
-    if not user or user['role'] not in ('admin', 'moderator'):
-        conn.close()
+    if not is_moderator():
         return jsonify({'success': False, 'error': 'Admin access required'}), 403
-    c.execute('SELECT * FROM forum_reports WHERE status = ? ORDER BY created_at DESC', ('pending',))
-    reports = [dict(row) for row in c.fetchall()]
-    conn.close()
-    return jsonify({'success': True, 'data': reports})
+    before = request.args.get('before', '\uffff')
+    before_id = request.args.get('before_id', 2**63 - 1, type=int)
+    limit = min(request.args.get('limit', 50, type=int), 200)
+    key = (before, before_id, limit)
+    now = _time.time()
+    cached = _reports_cache['pages'].get(key)
+    if cached and now - cached['timestamp'] < REPORTS_CACHE_TTL:
+        etag, body = cached['etag'], cached['body']
+    else:
+        version = _reports_cache['version']
+        with db_pool.acquire() as conn:
+            c = conn.cursor()
+            # Count + newest timestamp changes whenever a report is filed or resolved
+            c.execute(SQL_PENDING_REPORTS_STATE, ('pending',))
+            state = c.fetchone()
+            etag = f"{state['cnt']}-{state['newest']}"
+            if request.if_none_match.contains(etag):
+                body = None
+            else:
+                # Keyset pagination: ?before=<created_at>&before_id=<id> of the last report seen
+                # Plain tuples zipped against the column names once, instead of Row objects
+                c.row_factory = None
+                c.execute(SQL_PENDING_REPORTS_PAGE, ('pending', before, before, before_id, limit))
+                keys = [d[0] for d in c.description]
+                reports = [dict(zip(keys, row)) for row in c.fetchall()]
+                body = _orjson_dumps({'success': True, 'data': reports,
+                                      'next_before': [reports[-1]['created_at'], reports[-1]['id']]
+                                                     if len(reports) == limit else None})
+        # Skip the store if a write invalidated the cache while we were querying
+        if body is not None and version == _reports_cache['version']:
+            _reports_cache['pages'][key] = {'etag': etag, 'body': body, 'timestamp': now}
+    if request.if_none_match.contains(etag):
+        resp = Response(status=304)
+    else:
+        resp = Response(body, mimetype='application/json')
+    resp.set_etag(etag)
+    return resp
 
 @app.route('/api/admin/reports/<int:report_id>', methods=['PUT'])
 @login_required
 def resolve_report(report_id):
     data = request.json
-    user_id = session.get('user_id')
-    conn = get_db()
-    c = conn.cursor()
-    c.execute('SELECT role FROM users WHERE id = ?', (user_id,))
-    user = c.fetchone()
-    if not user or user['role'] not in ('admin', 'moderator'):
-        conn.close()
+    if not is_moderator():
         return jsonify({'success': False, 'error': 'Admin access required'}), 403
-    c.execute('UPDATE forum_reports SET status = ? WHERE id = ?', (data.get('status', 'reviewed'), report_id))
-    conn.commit()
-    conn.close()
-    return jsonify({'success': True})
+    with db_pool.acquire() as conn:
+        c = conn.cursor()
+        c.execute(SQL_UPDATE_REPORT_STATUS, (data.get('status', 'reviewed'), report_id))
+        conn.commit()
+    invalidate_reports_cache()
+    return '', 204
 
 # ─── SocketIO Events ─────────────────────────────────────────────────────────
 
-online_users = {}
+# Rooms larger than this are fanned out from a background task in chunks,
+# yielding between chunks so a big broadcast can't monopolize the server.
+BROADCAST_BATCH_SIZE = 50
+_broadcast_queue = queue.Queue()
+
+def _broadcast_worker():
+    # Single consumer, so each client still receives events in send order
+    while True:
+        event, payload, sids = _broadcast_queue.get()
+        for i in range(0, len(sids), BROADCAST_BATCH_SIZE):
+            for sid in sids[i:i + BROADCAST_BATCH_SIZE]:
+                socketio.emit(event, payload, to=sid, namespace='/chat')
+            socketio.sleep(0)
+        _broadcast_queue.task_done()
+
+socketio.start_background_task(_broadcast_worker)
+
+def broadcast_batched(event, payload, skip_sid=None):
+    """Emit an event to everyone in the chat room, batching large rooms."""
+    if SOCKETIO_MESSAGE_QUEUE:
+        # Each worker fans the room emit out to its own sockets; per-sid emits
+        # would each be a separate round trip through the queue
+        socketio.emit(event, payload, room=CHAT_ROOM, skip_sid=skip_sid, namespace='/chat')
+        return
+    sids = [sid for sid, _ in socketio.server.manager.get_participants('/chat', CHAT_ROOM) if sid != skip_sid]
+    if len(sids) <= BROADCAST_BATCH_SIZE and not _broadcast_queue.unfinished_tasks:
+        socketio.emit(event, payload, room=CHAT_ROOM, skip_sid=skip_sid, namespace='/chat')
+    else:
+        _broadcast_queue.put((event, payload, sids))
+
+# New chat messages are corked for CHAT_BROADCAST_INTERVAL and go out as one
+# 'new_messages' event carrying the list, so a burst costs one emit per socket
+# instead of one per message.
+CHAT_BROADCAST_INTERVAL = 0.02
+_chat_outbox = deque()
+
+def queue_chat_broadcast(msg):
+    _chat_outbox.append(msg)
+
+def _chat_broadcaster():
+    while True:
+        socketio.sleep(CHAT_BROADCAST_INTERVAL)
+        if _chat_outbox:
+            batch = [_chat_outbox.popleft() for _ in range(len(_chat_outbox))]
+            broadcast_batched('new_messages', batch)
+
+socketio.start_background_task(_chat_broadcaster)
+
+def chat_roster(skip_sid=None):
+    """Usernames currently in the chat room, built on demand from room membership.
+
+    With a message queue this only covers sockets connected to this worker.
+    """
+    names = []
+    for sid, eio_sid in socketio.server.manager.get_participants('/chat', CHAT_ROOM):
+        if sid == skip_sid:
+            continue
+        # Each socket's Flask-SocketIO managed session lives in its WSGI environ
+        sock_session = socketio.server.environ.get(eio_sid, {}).get('saved_session') or {}
+        if sock_session.get('chat_username'):
+            names.append(sock_session['chat_username'])
+    return names
+
+# Joins and leaves are corked like chat messages: handlers queue the name and
+# every PRESENCE_BROADCAST_INTERVAL one 'presence_update' goes out with the
+# names, so a reconnect storm costs one event per client instead of one per
+# join/leave. A single worker also sends its roster count, which clients take
+# as authoritative; with a message queue that count would only be this
+# worker's, so clients apply the joined/left deltas instead.
+PRESENCE_BROADCAST_INTERVAL = 0.1
+_presence_joined = deque()
+_presence_left = deque()
+
+def _presence_broadcaster():
+    while True:
+        socketio.sleep(PRESENCE_BROADCAST_INTERVAL)
+        if _presence_joined or _presence_left:
+            joined = [_presence_joined.popleft() for _ in range(len(_presence_joined))]
+            left = [_presence_left.popleft() for _ in range(len(_presence_left))]
+            update = {'joined': joined, 'left': left}
+            if not SOCKETIO_MESSAGE_QUEUE:
+                update['count'] = len(chat_roster())
+            broadcast_batched('presence_update', update)
+
+socketio.start_background_task(_presence_broadcaster)
+
+# Crawl progress goes to a per-user room so every tab of that user sees it
+@socketio.on('connect', namespace='/crawl')
+def handle_crawl_connect():
+    if 'user_id' not in session:
+        return False
+    join_room(f"user_{session['user_id']}")
 
 @socketio.on('connect', namespace='/chat')
 def handle_connect():
+    join_room(CHAT_ROOM)
     print(f'Client connected: {request.sid}')
 
 @socketio.on('disconnect', namespace='/chat')
 def handle_disconnect():
-    if request.sid in online_users:
-        username = online_users.pop(request.sid)
-        emit('user_left', {'username': username, 'online_users': list(online_users.values())},
-             namespace='/chat', broadcast=True)
+    username = session.get('chat_username')
+    if username:
+        _presence_left.append(username)
     print(f'Client disconnected: {request.sid}')
 
 @socketio.on('set_username', namespace='/chat')
 def handle_set_username(data):
     username = data.get('username', 'Anonymous')
-    online_users[request.sid] = username
-    emit('user_joined', {'username': username, 'online_users': list(online_users.values())},
-         namespace='/chat', broadcast=True)
+    first_join = 'chat_username' not in session
+    session['chat_username'] = username
+    # The joiner gets the roster now, minus itself on first join: its own
+    # join arrives with everyone else's in the corked presence_update
+    emit('initial_roster', {'online_users': chat_roster(skip_sid=request.sid if first_join else None)})
+    if first_join:
+        _presence_joined.append(username)
+
+# Chat messages are persisted in batches: handlers emit first, then append to
+# this queue, and a background task drains it every 100ms with one executemany.
+# A flood that queues CHAT_FLUSH_BATCH messages is written without waiting.
+CHAT_FLUSH_INTERVAL = 0.1
+CHAT_FLUSH_BATCH = 100
+_chat_write_queue = deque()
+_chat_write_lock = threading.Lock()
+
+# Message ids are handed out in memory so they can be broadcast before the row exists
+with db_pool.acquire() as _conn:
+    _chat_ids = itertools.count(_conn.execute('SELECT COALESCE(MAX(id), 0) + 1 FROM chat_messages').fetchone()[0])
+
+def flush_chat_messages():
+    """Write any queued chat messages to the DB in a single transaction."""
+    with _chat_write_lock:
+        if not _chat_write_queue:
+            return
+        # Messages appended while we copy stay queued for the next flush
+        batch = [_chat_write_queue.popleft() for _ in range(len(_chat_write_queue))]
+        try:
+            with db_pool.acquire() as conn:
+                try:
+                    conn.executemany(SQL_INSERT_CHAT, batch)
+                except sqlite3.IntegrityError:
+                    # Another worker process used these ids; keep the messages and let SQLite renumber
+                    conn.rollback()
+                    conn.executemany(SQL_INSERT_CHAT_AUTO_ID, [row[1:] for row in batch])
+                conn.commit()
+        except sqlite3.Error as e:
+            print(f"Chat flush error: {e}")
+            _chat_write_queue.extendleft(reversed(batch))
+
+def _chat_writer():
+    while True:
+        socketio.sleep(CHAT_FLUSH_INTERVAL)
+        flush_chat_messages()
+
+socketio.start_background_task(_chat_writer)
+atexit.register(flush_chat_messages)
 
 @socketio.on('send_message', namespace='/chat')
 def handle_send_message(data):
-    username = online_users.get(request.sid, data.get('username', 'Anonymous'))
+    username = session.get('chat_username') or data.get('username', 'Anonymous')
     message = data.get('message', '')
-    timestamp = datetime.now().isoformat()
+    timestamp = fast_now()
+    msg_id = next(_chat_ids)
 
-    # Save to DB
-    conn = get_db()
-    c = conn.cursor()
-    c.execute('INSERT INTO chat_messages (username, message, timestamp) VALUES (?, ?, ?)',
-              (username, message, timestamp))
-    conn.commit()
-    msg_id = c.lastrowid
-    conn.close()
-
-    emit('new_message', {
+    queue_chat_broadcast({
         'id': msg_id, 'username': username,
         'message': message, 'timestamp': timestamp
-    }, namespace='/chat', broadcast=True)
+    })
+    # Persisted by _chat_writer, off the emit path
+    _chat_write_queue.append((msg_id, username, message, timestamp))
+    if len(_chat_write_queue) >= CHAT_FLUSH_BATCH:
+        socketio.start_background_task(flush_chat_messages)
 
 # ─── Main ─────────────────────────────────────────────────────────────────────
 
 if __name__ == '__main__':
-    socketio.run(app, debug=True, port=5000)
+    # Debugger and reloader only when explicitly asked for; production runs under gunicorn
+    debug = os.environ.get('FLASK_ENV') == 'development'
+    socketio.run(app, debug=debug, use_reloader=debug, port=int(os.environ.get('PORT', 5000)),
+                 allow_unsafe_werkzeug=debug)
@@ -1377,19 +1377,17 @@ function clearSelection() {
 
 async function addSelectedProspects() {
     if (selectedProspectsForBulkAdd.size === 0) return;
-    const ids = Array.from(selectedProspectsForBulkAdd);
+    const prospects = crawledProspectsCache.filter(x => selectedProspectsForBulkAdd.has(x._temp_id));
     let ok = 0;
-    for (const id of ids) {
-        const p = crawledProspectsCache.find(x => x._temp_id === id);
-        if (!p) continue;
-        try {
-            const res = await fetch(`${API_BASE}/prospects`, {
-                method: 'POST', headers: {'Content-Type':'application/json'},
-                body: JSON.stringify(p)
-            });
-            if (res.ok) ok++;
-        } catch {}
-    }
+    try {
+        const res = await fetch(`${API_BASE}/prospects/bulk`, {
+            method: 'POST', headers: {'Content-Type':'application/json'},
+            body: JSON.stringify({ prospects })
+        });
+        const data = await res.json();
+        if (data.success) ok = data.inserted;
+        else showStatus(data.error || 'Error adding prospects', 'error');
+    } catch {}
     if (ok > 0) {
         showStatus(`Added ${ok} prospect${ok !== 1 ? 's' : ''} to pipeline`, 'success');
         // Clear crawled cache and hide bulk actions
@@ -1656,9 +1654,13 @@ async function runFirecrawl() {
     btn.textContent = 'SCANNING...';
     showStatus(type === 'scrape' ? 'Scraping page...' : 'Crawling website (this may take a moment)...', 'loading');
 
+    if (type === 'crawl') {
+        startCrawlJob(url, limit);
+        return;
+    }
+
     try {
         const payload = { url, type };
-        if (type === 'crawl') payload.limit = limit;
 
         const res = await fetch(`${API_BASE}/search`, {
             method: 'POST', headers: {'Content-Type':'application/json'},
@@ -1681,6 +1683,82 @@ async function runFirecrawl() {
     }
 }
 
+// Crawls run server-side; pages stream in over the /crawl socket as they finish.
+// Without a socket the job is polled instead.
+let crawlSocket = null;
+let activeCrawl = null;
+
+function connectCrawlSocket() {
+    if (crawlSocket) return Promise.resolve(crawlSocket.connected);
+    return new Promise(resolve => {
+        try {
+            crawlSocket = io(window.location.origin + '/crawl', { transports: ['websocket', 'polling'] });
+        } catch (e) {
+            resolve(false);
+            return;
+        }
+        crawlSocket.on('crawl_progress', (d) => {
+            if (!activeCrawl || d.job_id !== activeCrawl.jobId) return;
+            activeCrawl.prospects.push(...d.prospects);
+            showStatus(`Crawling... ${d.pages_done} pages, ${activeCrawl.prospects.length} prospects so far`, 'loading');
+            displayCrawledProspects(activeCrawl.prospects, activeCrawl.url);
+        });
+        crawlSocket.on('crawl_done', (d) => finishCrawlJob(d));
+        crawlSocket.on('crawl_failed', (d) => finishCrawlJob(d));
+        crawlSocket.once('connect', () => resolve(true));
+        crawlSocket.once('connect_error', () => resolve(false));
+    });
+}
+
+async function startCrawlJob(url, limit) {
+    let jobId = Date.now().toString(36) + Math.random().toString(36).slice(2, 10);
+    activeCrawl = { jobId, url, prospects: [] };
+    const live = await connectCrawlSocket();
+    try {
+        const res = await fetch(`${API_BASE}/search`, {
+            method: 'POST', headers: {'Content-Type':'application/json'},
+            body: JSON.stringify({ url, type: 'crawl', limit, job_id: jobId })
+        });
+        const data = await res.json();
+        if (!data.success) { finishCrawlJob({ job_id: jobId, success: false, error: data.error }); return; }
+        // The server assigns a new id if ours was already taken
+        if (data.job_id !== jobId && activeCrawl && activeCrawl.jobId === jobId) {
+            jobId = data.job_id;
+            activeCrawl.jobId = jobId;
+        }
+        if (!live) pollCrawlJob(jobId);
+    } catch (error) {
+        finishCrawlJob({ job_id: jobId, success: false, error: null });
+    }
+}
+
+async function pollCrawlJob(jobId) {
+    while (activeCrawl && activeCrawl.jobId === jobId) {
+        await new Promise(r => setTimeout(r, 3000));
+        try {
+            const res = await fetch(`${API_BASE}/search/jobs/${jobId}`);
+            const data = await res.json();
+            if (data.status !== 'running') { finishCrawlJob({ ...data, job_id: jobId }); return; }
+        } catch (e) { /* keep polling */ }
+    }
+}
+
+function finishCrawlJob(data) {
+    if (!activeCrawl || data.job_id !== activeCrawl.jobId) return;
+    const url = activeCrawl.url;
+    activeCrawl = null;
+    const btn = document.getElementById('crawl-btn');
+    btn.disabled = false;
+    btn.textContent = 'SCAN';
+    if (data.success === false || data.error) {
+        showStatus(data.error ? `Error: ${data.error}` : 'Connection error. Check backend.', 'error');
+        return;
+    }
+    const count = data.prospects ? data.prospects.length : 0;
+    showStatus(count > 0 ? `Found ${count} prospects - select to add` : 'No prospects detected. Try a different URL.', count > 0 ? 'success' : 'warning');
+    displayCrawledProspects(data.prospects || [], url);
+}
+
 function displayCrawledProspects(crawledProspects, sourceUrl) {
     const container = document.getElementById('prospects-container');
     crawledProspectsCache = [];
@@ -2385,7 +2463,7 @@ async function handleCSVImport(e) {
         const res = await fetch(`${API_BASE}/import-csv`, { method: 'POST', body: formData });
         const data = await res.json();
         if (data.success) {
-            showStatus(`Imported ${data.imported} prospects${data.errors ? `, ${data.errors} errors` : ''}`, 'success');
+            showStatus(`Imported ${data.imported} prospects${data.duplicates ? `, ${data.duplicates} duplicates skipped` : ''}${data.errors ? `, ${data.errors} errors` : ''}`, 'success');
             await loadProspects();
         } else {
             showStatus(`Import error: ${data.error}`, 'error');
@@ -2547,29 +2625,49 @@ function connectChatSocket() {
         chatSocket.on('connect', () => {
             if (chatUsername) {
                 chatSocket.emit('set_username', { username: chatUsername });
+            } else {
+                loadChatOnlineCount();
             }
         });
 
-        chatSocket.on('new_message', (msg) => {
-            appendChatMessage(msg);
-            if (!chatOpen && msg.username !== chatUsername) {
-                unreadMessages++;
-                updateChatBadge();
-            }
+        // Messages arrive in batches, one event per server flush
+        chatSocket.on('new_messages', (msgs) => {
+            msgs.forEach(msg => {
+                appendChatMessage(msg);
+                if (!chatOpen && msg.username !== chatUsername) unreadMessages++;
+            });
+            updateChatBadge();
         });
 
-        chatSocket.on('user_joined', (data) => {
+        chatSocket.on('initial_roster', (data) => {
             document.getElementById('chat-online-count').textContent = data.online_users.length;
         });
 
-        chatSocket.on('user_left', (data) => {
-            document.getElementById('chat-online-count').textContent = data.online_users.length;
+        chatSocket.on('presence_update', (data) => {
+            const el = document.getElementById('chat-online-count');
+            if (data.count !== undefined) {
+                el.textContent = data.count;
+            } else {
+                // Multi-worker servers only send deltas
+                const delta = data.joined.length - data.left.length;
+                el.textContent = Math.max(0, (parseInt(el.textContent, 10) || 0) + delta);
+            }
         });
     } catch (e) {
         console.log('Chat socket not available, using REST fallback');
     }
 }
 
+async function loadChatOnlineCount() {
+    try {
+        const res = await fetch(`${API_BASE}/chat/online`);
+        const data = await res.json();
+        if (data.success) {
+            document.getElementById('chat-online-count').textContent = data.count;
+        }
+    } catch {}
+}
+
 function setChatUsername() {
     const input = document.getElementById('chat-username-input');
     const name = input.value.trim();